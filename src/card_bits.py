@@ -0,0 +1,96 @@
+import sys
+from itertools import combinations
+
+from pydealer import (  # type: ignore
+    Card,
+    Stack,
+)
+
+from src.constants import DECODE_SUIT, DECODE_VALUE
+
+# Each of the 52 cards gets an id in 0..51 (4 * value index + suit index), so any set of
+# cards fits in a single int with one bit per card. The codes are interned so every card
+# string handed out shares one object and dict/set lookups hit the identity fast path.
+CARD_CODES = tuple(sys.intern(suit + value) for value in DECODE_VALUE for suit in DECODE_SUIT)
+
+CARD_ID = {card_code: card_id for card_id, card_code in enumerate(CARD_CODES)}
+
+VALUE_INDEX = {value: value_index for value_index, value in enumerate(DECODE_VALUE.values())}
+
+NO_LAST_PLAY = len(VALUE_INDEX)
+
+# turns to advance after a play, indexed by [value index of the previous play, or NO_LAST_PLAY]
+# [value index of the play]; matching the previous value skips a player, except with 2s
+TURN_DELTA = tuple(
+    tuple(
+        2 if last_value == value and value != VALUE_INDEX["2"] else 1
+        for value in range(len(VALUE_INDEX))
+    )
+    for last_value in range(len(VALUE_INDEX) + 1)
+)
+
+CARD_ID_BY_NAME = {
+    f"{DECODE_VALUE[card_code[1]]} of {DECODE_SUIT[card_code[0]]}": card_id
+    for card_code, card_id in CARD_ID.items()
+}
+
+CARD_CODE_BY_NAME = {
+    card_name: CARD_CODES[card_id] for card_name, card_id in CARD_ID_BY_NAME.items()
+}
+
+
+def card_id(card: Card) -> int:
+    return CARD_ID_BY_NAME[card.name]
+
+
+def card_code(card: Card) -> str:
+    return CARD_CODE_BY_NAME[card.name]
+
+
+def card_bit(card: Card) -> int:
+    return 1 << CARD_ID_BY_NAME[card.name]
+
+
+def mask_from_stack(stack: Stack) -> int:
+    mask = 0
+    for card in stack:
+        mask |= 1 << CARD_ID_BY_NAME[card.name]
+    return mask
+
+
+def remove_cards_mask_from_stack(stack: Stack, cards_mask: int) -> None:
+    stack.cards = [card for card in stack.cards if not card_bit(card) & cards_mask]
+
+
+def codes_from_mask(mask: int) -> list[str]:
+    card_codes = []
+    while mask:
+        low_bit = mask & -mask
+        card_codes.append(CARD_CODES[low_bit.bit_length() - 1])
+        mask ^= low_bit
+    return card_codes
+
+
+def build_value_plays() -> tuple[tuple[tuple[tuple[str, ...], ...], ...], ...]:
+    """
+    VALUE_PLAYS[value_index][suit_bits][length] holds every play of length cards that can be
+    made from the cards of one value whose suits are set in the 4 bit suit_bits
+    """
+
+    value_plays = []
+
+    for value_index in range(len(DECODE_VALUE)):
+        plays_by_suit_bits = []
+        for suit_bits in range(1 << len(DECODE_SUIT)):
+            cards = codes_from_mask(mask=suit_bits << (len(DECODE_SUIT) * value_index))
+            plays_by_length = tuple(
+                tuple(",".join(combination) for combination in combinations(cards, length))
+                for length in range(len(cards) + 1)
+            )
+            plays_by_suit_bits.append(plays_by_length)
+        value_plays.append(tuple(plays_by_suit_bits))
+
+    return tuple(value_plays)
+
+
+VALUE_PLAYS = build_value_plays()
@@ -27,4 +27,8 @@ if __name__ == "__main__":
 
     player = player_class(player_number=player_number)
     player.bind_to_socket()
-    player.run_communication_loop()
+    # the player serves until it is stopped, so its resources are released on the way out
+    try:
+        player.run_communication_loop()
+    finally:
+        player.close()
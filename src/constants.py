@@ -66,3 +66,11 @@ PLAY_RANKS = {
     "4": 1,
     "3": 0,
 }
+
+CARD_RANK = {suit + value: rank for suit in DECODE_SUIT for value, rank in PLAY_RANKS.items()}
+
+# play rank indexed by ord() of a card code's value character, -1 for anything else
+rank_by_ord = [-1] * 128
+for value, rank in PLAY_RANKS.items():
+    rank_by_ord[ord(value)] = rank
+RANK_BY_ORD = tuple(rank_by_ord)
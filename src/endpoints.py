@@ -0,0 +1,23 @@
+import os
+
+# Players in the docker-compose setup run in separate containers and have to talk over tcp.
+# When every process is on one host, SCREW_TRANSPORT=ipc uses unix domain sockets instead.
+TRANSPORT = os.environ.get("SCREW_TRANSPORT", "tcp")
+
+PORT = 5000
+
+
+def player_bind_endpoint(player_number: int) -> str:
+    if TRANSPORT == "ipc":
+        return ipc_endpoint(player_number=player_number)
+    return f"tcp://*:{PORT}"
+
+
+def player_connect_endpoint(player_number: int) -> str:
+    if TRANSPORT == "ipc":
+        return ipc_endpoint(player_number=player_number)
+    return f"tcp://player{player_number}:{PORT}"
+
+
+def ipc_endpoint(player_number: int) -> str:
+    return f"ipc:///tmp/screw-player{player_number}.ipc"
@@ -3,10 +3,12 @@ import traceback
 from typing import Optional
 
 from pydealer import (  # type: ignore
+    Card,
     Deck,
     Stack,
 )
 
+from src.card_bits import mask_from_stack, NO_LAST_PLAY, TURN_DELTA, VALUE_INDEX
 from src.constants import (
     DECK_LEN,
     HAND_CARDS,
@@ -19,8 +21,6 @@ from src.game_types import Action, Hand, Play, RequestType, Response, TableStack
 from src.messaging import Messaging
 from src.utilities import (
     are_all_cards_same_value,
-    build_face_up_table_stack,
-    card_set_from_stack,
     convert_response_to_play,
     count_player_cards,
     deserialize_cards,
@@ -88,17 +88,17 @@ class Game:
             self.receive_table_card_selection(player_number=player_number)
             return True
         except AssertionError as e:
-            logging.warning(f"handle_table_card_selection error: {e}")
+            logging.warning("handle_table_card_selection error: %s", e)
             message = "Card selection not valid, cards must be {TABLE_STACKS} unique cards"
         except CardsNotAvailableException as e:
-            logging.warning(f"handle_table_card_selection error: {e}")
+            logging.warning("handle_table_card_selection error: %s", e)
             message = "Those cards are not in hand to be placed, try again"
         except CardEncodeDecodeException as e:
-            logging.warning(f"handle_table_card_selection error: {e}")
+            logging.warning("handle_table_card_selection error: %s", e)
             message = "Error parsing cards, try again"
         except Exception as e:
             traceback.print_exc()
-            logging.warning(f"handle_table_card_selection error: {e}")
+            logging.warning("handle_table_card_selection error: %s", e)
             message = "Server error, try again"
 
         self.messaging.invalid_action(player_number=player_number, message=message)
@@ -125,8 +125,9 @@ class Game:
         self.place_table_cards(player_number=player_number, stack=cards)
 
     def place_table_cards(self, player_number: int, stack: Stack) -> None:
+        table_stacks = self.player_hands[player_number].table_stacks
         for i, card in enumerate(stack):
-            self.player_hands[player_number].table_stacks[i].top_card = card
+            table_stacks[i].top_card = card
 
     def deal_table_cards(self) -> None:
         for i in range(TABLE_STACKS):
@@ -134,32 +135,45 @@ class Game:
                 self.deal_table_card(player_number=player_number)
 
     def deal_table_card(self, player_number: int) -> None:
-        card_list = self.deck.deal(num=1)
+        # pop from the top of the deck directly; Deck.deal builds a Stack for every card
+        card = self.deck.cards.pop()
         table_stack = TableStack(
             top_card=None,
-            bottom_card=card_list[0],
+            bottom_card=card,
         )
         self.player_hands[player_number].table_stacks.append(table_stack)
 
     def deal_hand_cards(self) -> None:
-
+        # cards are dealt one at a time round robin from the top of the deck, and each hand is
+        # announced in one update; the deck always outlasts the initial deal, so there is no
+        # depletion to report
+        deck_cards = self.deck.cards
+        hand_cards: list[list[Card]] = [[] for _ in range(self.number_of_players)]
         for i in range(HAND_CARDS + TABLE_STACKS):
             for player_number in range(self.number_of_players):
-                self.deal_card(player_number=player_number)
+                hand_cards[player_number].append(deck_cards.pop())
+
+        for player_number in range(self.number_of_players):
+            cards = Stack(cards=hand_cards[player_number])
+            self.player_hands[player_number].add_cards(cards=cards)
+            self.messaging.initial_deal(player_number=player_number, hand_cards=cards)
 
     def deal_card(self, player_number: int) -> None:
-        if len(self.deck):
-            dealt_cards = self.deck.deal(num=1)
-            card = dealt_cards.cards[0]
-            self.player_hands[player_number].hand_stack += dealt_cards
+        deck_cards = self.deck.cards
+        if deck_cards:
+            card = deck_cards.pop()
+            self.player_hands[player_number].add_cards(cards=[card])
             self.messaging.card_draw(player_number=player_number, card=card)
-            if not len(self.deck):
+            if not deck_cards:
                 self.messaging.deck_depleted()
 
     def run(self) -> None:
         while self.win is None:
             self.loop_until_valid_play(player_number=self.player_turn)
-            self.assert_conservation_of_cards()
+            # a debug invariant; python -O skips the card count along with the assert
+            if __debug__:
+                self.assert_conservation_of_cards()
+        self.messaging.flush_updates()
 
     def loop_until_valid_play(self, player_number: int) -> None:
 
@@ -175,10 +189,14 @@ class Game:
             self.update_game_state_for_play(play=play, player_number=player_number)
             return True
         except CardsNotAvailableException as e:
-            logging.warning(f"get_valid_play error: {e}")
+            logging.warning("get_valid_play error: %s", e)
             message = "Cards not available for play, try again"
+        except (AssertionError, CardEncodeDecodeException) as e:
+            # a play that breaks the rules or can't be parsed; nothing unexpected to trace
+            logging.warning("get_valid_play error: %s", e)
+            message = "Illegal play, try again"
         except Exception as e:
-            logging.warning(f"get_valid_play error: {e}")
+            logging.warning("get_valid_play error: %s", e)
             traceback.print_exc()
             message = "Illegal play, try again"
 
@@ -211,15 +229,18 @@ class Game:
             assert len(self.discard_pile) > 0
         else:
             assert play.cards
-            assert len(play.cards)
-            assert are_all_cards_same_value(play.cards)
-            if len(self.player_hands[player_number].hand_stack):
+            hand = self.player_hands[player_number]
+            if hand.hand_mask:
+                # every available play is a non-empty run of one value, so the membership
+                # check also covers the same value check
                 assert is_play_available(
-                    hand=self.player_hands[player_number],
+                    hand=hand,
                     last_play=self.last_play,
                     cards_played=play.cards,
                     discard_pile=self.discard_pile,
                 )
+            else:
+                assert are_all_cards_same_value(play.cards)
 
     def update_game_state_for_play(self, play: Play, player_number: int) -> None:
         if play.action == Action.PICK_UP_DISCARD_PILE:
@@ -227,7 +248,7 @@ class Game:
         elif play.action == Action.PLAY_FACE_DOWN:
             self.handle_face_down_play(player_number=player_number)
         else:
-            if len(self.player_hands[player_number].hand_stack):
+            if self.player_hands[player_number].hand_mask:
                 self.handle_play_from_hand(player_number=player_number, cards_played=play.cards)
             else:
                 self.handle_face_up_play(player_number=player_number, cards_played=play.cards)
@@ -241,13 +262,14 @@ class Game:
             self.messaging.play_from_facedown_success(player_number=player_number, card=card)
             self.play_cards(player_number=player_number, cards=card_stack)
         else:
-            self.player_hands[player_number].hand_stack += card_stack
+            self.player_hands[player_number].add_cards(cards=card_stack)
             self.pickup_discard_pile(player_number=player_number)
             self.messaging.play_from_facedown_failure(player_number=player_number, card=card)
 
     def handle_face_up_play(self, player_number: int, cards_played: Stack) -> None:
+        hand = self.player_hands[player_number]
         if is_play_available(
-            hand=self.player_hands[player_number],
+            hand=hand,
             last_play=self.last_play,
             cards_played=cards_played,
             discard_pile=self.discard_pile,
@@ -258,7 +280,7 @@ class Game:
         else:
             try:
                 self.remove_cards_from_face_up(player_number=player_number, cards=cards_played)
-                self.player_hands[player_number].hand_stack += cards_played
+                hand.add_cards(cards=cards_played)
                 self.messaging.play_from_faceup_failure(
                     player_number=player_number, cards=cards_played
                 )
@@ -272,12 +294,13 @@ class Game:
         self.play_cards(player_number=player_number, cards=cards_played)
 
     def pickup_discard_pile(self, player_number: int) -> None:
-        cards_list = self.discard_pile.empty(return_cards=True)
-        cards = Stack(cards=cards_list)
-        self.player_hands[player_number].hand_stack += cards
+        discarded_cards = self.discard_pile.cards
+        self.player_hands[player_number].add_cards(cards=discarded_cards)
         self.last_play = None
         self.update_turn(count=1)
-        self.messaging.discard_pile_pickup(player_number=player_number, cards=cards)
+        # the update is serialized as it is queued, so the pile can be cleared afterwards
+        self.messaging.discard_pile_pickup(player_number=player_number, cards=discarded_cards)
+        discarded_cards.clear()
 
     def play_cards(self, player_number: int, cards: Stack) -> None:
         stored_last_play = self.last_play
@@ -288,20 +311,17 @@ class Game:
             self.win = player_number
 
         if self.check_for_burn():
-            cards_list = self.discard_pile.empty(return_cards=True)
+            self.eliminated_cards.cards.extend(self.discard_pile.cards)
+            self.discard_pile.cards.clear()
             self.last_play = None
-            self.eliminated_cards += Stack(cards=cards_list)
             self.messaging.burn_discard_pile()
         else:
             self.deal_card(player_number=player_number)
-            if (
-                stored_last_play
-                and stored_last_play.cards[0].value == self.last_play[0].value
-                and self.last_play[0].value != "2"
-            ):
-                self.update_turn(count=2)
+            if stored_last_play is None:
+                last_value = NO_LAST_PLAY
             else:
-                self.update_turn(count=1)
+                last_value = VALUE_INDEX[stored_last_play[0].value]
+            self.update_turn(count=TURN_DELTA[last_value][VALUE_INDEX[cards[0].value]])
 
     def update_turn(self, count: int) -> None:
         self.player_turn = (self.player_turn + count) % self.number_of_players
@@ -310,53 +330,48 @@ class Game:
         assert self.last_play is not None
         if self.last_play[0].value == "10":
             return True
-        if (
-            len(self.discard_pile) >= 4
-            and self.last_play[0].value != "2"
-            and are_all_cards_same_value(stack=self.discard_pile[-4:])
-        ):
-            return True
+        # compare the top four cards in place on the deque instead of slicing the Stack and
+        # building a set of values
+        discarded_cards = self.discard_pile.cards
+        if len(discarded_cards) >= 4 and self.last_play[0].value != "2":
+            top_value = discarded_cards[-1].value
+            return (
+                discarded_cards[-2].value == top_value
+                and discarded_cards[-3].value == top_value
+                and discarded_cards[-4].value == top_value
+            )
         return False
 
     def remove_cards_from_hand_stack(self, player_number: int, cards: Stack) -> None:
 
-        hand_stack = self.player_hands[player_number].hand_stack
+        hand = self.player_hands[player_number]
+        cards_mask = mask_from_stack(cards)
 
-        if len(card_set_from_stack(cards) - card_set_from_stack(hand_stack)):
+        if cards_mask & ~hand.hand_mask:
             raise CardsNotAvailableException("Cards not available to be played from hand")
 
-        for card in cards:
-            hand_stack.get(card.name)
+        hand.remove_cards(cards_mask=cards_mask)
 
     def remove_cards_from_face_up(self, player_number: int, cards: Stack) -> None:
 
-        face_up_cards = build_face_up_table_stack(
-            table_stacks=self.player_hands[player_number].table_stacks
-        )
+        face_up_table_stacks = {
+            table_stack.top_card.name: table_stack
+            for table_stack in self.player_hands[player_number].table_stacks
+            if table_stack.top_card is not None
+        }
 
-        if len(card_set_from_stack(cards) - card_set_from_stack(face_up_cards)):
+        # look every card up before clearing any so a bad play leaves the table untouched
+        try:
+            played_table_stacks = [face_up_table_stacks.pop(card.name) for card in cards]
+        except KeyError:
             raise CardsNotAvailableException("Cards not available to be played from table")
 
-        count_cards_to_remove = len(cards)
-        count_cards_removed = 0
-
-        for card in cards:
-            found = False
-            for table_stack in self.player_hands[player_number].table_stacks:
-                if table_stack.top_card == card:
-                    table_stack.top_card = None
-                    found = True
-                    break
-            if found:
-                count_cards_removed += 1
-
-        if count_cards_removed != count_cards_to_remove:
-            raise CardsNotAvailableException("Cards not found on table")
+        for table_stack in played_table_stacks:
+            table_stack.top_card = None
 
     def check_victory(self, player_number: int) -> bool:
-        victory = (not len(self.player_hands[player_number].table_stacks)) and (
-            not len(self.player_hands[player_number].hand_stack)
-        )
+        hand = self.player_hands[player_number]
+        victory = not hand.table_stacks and not hand.hand_mask
         if victory:
             self.messaging.player_wins(player_number=self.player_turn)
         return victory
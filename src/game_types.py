@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import Iterable, Optional
 
 from pydantic import BaseModel
 from pydealer import (  # type: ignore
@@ -8,22 +8,39 @@ from pydealer import (  # type: ignore
     Stack,
 )
 
+from src.card_bits import mask_from_stack, remove_cards_mask_from_stack
+
 
 class RequestType(Enum):
     SET_TABLE_CARDS = 1
     PLAY = 2
 
 
-@dataclass
+@dataclass(slots=True)
 class TableStack:
     bottom_card: Card
     top_card: Optional[Card] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Hand:
     table_stacks: list[TableStack] = field(default_factory=list)
-    hand_stack: Stack = Stack()
+    hand_stack: Stack = field(default_factory=Stack)
+    # card mask of hand_stack; once the hand is built its cards only come and go through
+    # add_cards and remove_cards, which keep the mask in step like PlayerState does for
+    # PlayerHand
+    hand_mask: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.hand_mask = mask_from_stack(self.hand_stack)
+
+    def add_cards(self, cards: Iterable[Card]) -> None:
+        self.hand_stack.cards.extend(cards)
+        self.hand_mask |= mask_from_stack(cards)
+
+    def remove_cards(self, cards_mask: int) -> None:
+        remove_cards_mask_from_stack(stack=self.hand_stack, cards_mask=cards_mask)
+        self.hand_mask &= ~cards_mask
 
 
 class Action(Enum):
@@ -35,7 +52,7 @@ class Action(Enum):
     PLAY_KNOWN_CARDS = 5
 
 
-@dataclass
+@dataclass(slots=True)
 class Play:
     action: Action
     cards: Optional[Stack] = None
@@ -47,6 +64,7 @@ class UpdateType(Enum):
     PLAYER_WINS = 102
     YOU_DREW_CARD = 200
     PLAYER_DREW_CARD = 201
+    INITIAL_DEAL = 202
     YOU_PICKED_UP_DISCARD_PILE = 300
     PLAYER_PICKED_UP_DISCARD_PILE = 301
     BURN_DISCARD_PILE = 302
@@ -1,4 +1,3 @@
-import json
 import logging
 import sys
 from multiprocessing import Pipe, Process
@@ -6,10 +5,17 @@ from multiprocessing.connection import Connection
 
 import zmq
 
+from src.endpoints import player_connect_endpoint
 from src.game import Game
 from src.messaging import Messaging
+from src.wire import (
+    decode_routed_messages,
+    EXIT_MESSAGE,
+    group_routed_messages,
+    REQUEST_MESSAGE,
+)
 
-context = zmq.Context()
+context: zmq.Context = zmq.Context.instance()
 
 logging.basicConfig(level=logging.INFO)
 
@@ -20,7 +26,7 @@ def run_game(number_of_players: int, connection: Connection) -> None:
     game = Game(number_of_players=number_of_players, messaging=messaging)
     game.setup()
     game.run()
-    connection.send("Exiting")
+    connection.send_bytes(EXIT_MESSAGE)
 
     return
 
@@ -30,27 +36,50 @@ def create_socket_connections(number_of_players: int) -> dict:
 
     for i in range(number_of_players):
         socket = context.socket(zmq.REQ)
-        socket.connect(f"tcp://player{i}:5000")
+        # every message is acknowledged before the router exits, so nothing is left to linger
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.connect(player_connect_endpoint(player_number=i))
         sockets[i] = socket
 
     return sockets
 
 
-def route_communication(connection: Connection, sockets: dict) -> bool:
+def collect_reply(sockets: dict, pending_replies: set[int], player_number: int) -> None:
+    # a REQ socket has to take the reply to its last send before it can send again
+    if player_number in pending_replies:
+        pending_replies.remove(player_number)
+        response = sockets[player_number].recv()
+        logging.info("Response: %s", response)
 
-    message = connection.recv()
-    logging.info(f"Message from game: {message}")
 
-    if message == "Exiting":
+def route_communication(connection: Connection, sockets: dict, pending_replies: set[int]) -> bool:
+
+    message = connection.recv_bytes()
+
+    if message == EXIT_MESSAGE:
+        logging.info("Message from game: Exiting")
+        for player_number in list(pending_replies):
+            collect_reply(
+                sockets=sockets, pending_replies=pending_replies, player_number=player_number
+            )
         return False
     else:
-        message_dict = json.loads(message)
-        player_number = message_dict["recipient"]
-        socket = sockets[player_number]
-        socket.send_string(message)
-        response = socket.recv()
-        logging.info(f"Response: {response}")
-        connection.send(response)
+        messages = group_routed_messages(decode_routed_messages(message))
+        for player_number, frames in messages:
+            logging.info("Message from game: %s", (player_number, frames))
+            socket = sockets[player_number]
+            collect_reply(
+                sockets=sockets, pending_replies=pending_replies, player_number=player_number
+            )
+            socket.send_multipart(frames)
+            if frames[-2] == REQUEST_MESSAGE:
+                response = socket.recv()
+                logging.info("Response: %s", response)
+                connection.send_bytes(response)
+            else:
+                # don't wait for a player to work through its updates; the acknowledgement is
+                # collected before that player's next message, so the game keeps moving
+                pending_replies.add(player_number)
 
     return True
 
@@ -68,7 +97,11 @@ if __name__ == "__main__":
     logging.info("Starting game")
     game_process.start()
 
-    while route_communication(connection=conn_main, sockets=sockets):
+    pending_replies: set[int] = set()
+
+    while route_communication(
+        connection=conn_main, sockets=sockets, pending_replies=pending_replies
+    ):
         pass
 
     game_process.join()
@@ -1,6 +1,5 @@
-import json
 from multiprocessing.connection import Connection
-from typing import Optional
+from typing import Iterable, Optional
 
 from pydealer import (  # type: ignore
     Card,
@@ -8,7 +7,21 @@ from pydealer import (  # type: ignore
 )
 
 from src.game_types import RequestType, Response, Update, UpdateType
-from src.utilities import serialize_card, serialize_cards
+from src.utilities import serialize_card, serialize_cards, serialize_cards_iter
+from src.wire import (
+    decode_response,
+    encode_request,
+    encode_routed_messages,
+    REQUEST_MESSAGE,
+    RoutedMessage,
+    serialize_update,
+    serialize_update_batch,
+    UPDATE_MESSAGE,
+)
+
+# updates that carry nothing but their type are the same bytes every time
+DECK_DEPLETED_UPDATE = serialize_update(Update(update_type=UpdateType.DECK_DEPLETED))
+BURN_DISCARD_PILE_UPDATE = serialize_update(Update(update_type=UpdateType.BURN_DISCARD_PILE))
 
 
 class Messaging:
@@ -18,25 +31,42 @@ class Messaging:
         connection: Connection,
     ) -> None:
 
-        self.number_of_players = number_of_players
         self.connection = connection
+        self.init_update_queues(number_of_players=number_of_players)
+        return
+
+    def init_update_queues(self, number_of_players: int) -> None:
+        # shared with messaging that delivers updates without a connection
+        self.number_of_players = number_of_players
+        # one queue per player, indexed by player number
+        self.update_queues: list[list[bytes]] = [[] for i in range(number_of_players)]
         return
 
     def game_initiated(self, number_of_players: int) -> None:
-        update = Update(update_type=UpdateType.GAME_INITIATED, number_of_players=number_of_players)
+        # updates are built from the game's own state, so like decode_update they skip validation
+        update = Update.construct(
+            update_type=UpdateType.GAME_INITIATED, number_of_players=number_of_players
+        )
         self.update_players(update=update)
         return
 
     def deck_depleted(self) -> None:
-        update = Update(update_type=UpdateType.DECK_DEPLETED)
-        self.update_players(update=update)
+        self.queue_for_players(serialized_update=DECK_DEPLETED_UPDATE)
         return
 
     def player_wins(self, player_number: int) -> None:
-        update = Update(update_type=UpdateType.PLAYER_WINS, player_number=player_number)
+        update = Update.construct(update_type=UpdateType.PLAYER_WINS, player_number=player_number)
         self.update_players(update=update)
         return
 
+    def initial_deal(self, player_number: int, hand_cards: Stack) -> None:
+        update = Update.construct(
+            update_type=UpdateType.INITIAL_DEAL,
+            cards=serialize_cards(cards=hand_cards),
+        )
+        self.update_player(player_number=player_number, update=update)
+        return
+
     def card_draw(self, player_number: int, card: Card) -> None:
         self.you_drew_card(player_number=player_number, card=card)
         self.player_drew_card(player_number=player_number)
@@ -44,40 +74,37 @@ class Messaging:
 
     def you_drew_card(self, player_number: int, card: Card) -> None:
         serialized_card = serialize_card(card=card)
-        update = Update(update_type=UpdateType.YOU_DREW_CARD, cards=serialized_card)
+        update = Update.construct(update_type=UpdateType.YOU_DREW_CARD, cards=serialized_card)
         self.update_player(player_number=player_number, update=update)
         return
 
     def player_drew_card(self, player_number: int) -> None:
-        update = Update(
+        update = Update.construct(
             update_type=UpdateType.PLAYER_DREW_CARD,
             player_number=player_number,
         )
         self.update_players(update=update, exclude_player=player_number)
         return
 
-    def discard_pile_pickup(self, player_number: int, cards: Stack) -> None:
+    def discard_pile_pickup(self, player_number: int, cards: Iterable[Card]) -> None:
         self.you_picked_up_discard_pile(player_number=player_number, cards=cards)
         self.player_picked_up_discard_pile(player_number=player_number)
         return
 
-    def you_picked_up_discard_pile(self, player_number: int, cards: Stack) -> None:
-        update = Update(
+    def you_picked_up_discard_pile(self, player_number: int, cards: Iterable[Card]) -> None:
+        update = Update.construct(
             update_type=UpdateType.YOU_PICKED_UP_DISCARD_PILE,
-            cards=serialize_cards(cards=cards),
+            cards=serialize_cards_iter(cards=cards),
         )
         self.update_player(player_number=player_number, update=update)
         return
 
     def burn_discard_pile(self) -> None:
-        update = Update(
-            update_type=UpdateType.BURN_DISCARD_PILE,
-        )
-        self.update_players(update=update)
+        self.queue_for_players(serialized_update=BURN_DISCARD_PILE_UPDATE)
         return
 
     def player_picked_up_discard_pile(self, player_number: int) -> None:
-        update = Update(
+        update = Update.construct(
             update_type=UpdateType.PLAYER_PICKED_UP_DISCARD_PILE,
             player_number=player_number,
         )
@@ -85,7 +112,7 @@ class Messaging:
         return
 
     def play_from_hand(self, player_number: int, cards: Stack) -> None:
-        update = Update(
+        update = Update.construct(
             update_type=UpdateType.PLAY_FROM_HAND,
             cards=serialize_cards(cards=cards),
             player_number=player_number,
@@ -95,7 +122,7 @@ class Messaging:
         return
 
     def play_from_table(self, player_number: int, cards: Stack) -> None:
-        update = Update(
+        update = Update.construct(
             update_type=UpdateType.PLAY_FROM_TABLE,
             cards=serialize_cards(cards=cards),
             player_number=player_number,
@@ -105,7 +132,7 @@ class Messaging:
         return
 
     def play_from_facedown_success(self, player_number: int, card: Card) -> None:
-        update = Update(
+        update = Update.construct(
             update_type=UpdateType.PLAY_FROM_FACEDOWN_SUCCESS,
             cards=serialize_card(card=card),
             player_number=player_number,
@@ -115,7 +142,7 @@ class Messaging:
         return
 
     def play_from_facedown_failure(self, player_number: int, card: Card) -> None:
-        update = Update(
+        update = Update.construct(
             update_type=UpdateType.PLAY_FROM_FACEDOWN_FAILURE,
             cards=serialize_card(card=card),
             player_number=player_number,
@@ -125,7 +152,7 @@ class Messaging:
         return
 
     def play_from_faceup_failure(self, player_number: int, cards: Stack) -> None:
-        update = Update(
+        update = Update.construct(
             update_type=UpdateType.PLAY_FROM_FACEUP_FAILURE,
             cards=serialize_cards(cards=cards),
             player_number=player_number,
@@ -135,7 +162,7 @@ class Messaging:
         return
 
     def set_table_cards(self, player_number: int, cards: Stack) -> None:
-        update = Update(
+        update = Update.construct(
             update_type=UpdateType.SET_TABLE_CARDS,
             cards=serialize_cards(cards=cards),
             player_number=player_number,
@@ -145,47 +172,86 @@ class Messaging:
         return
 
     def invalid_action(self, player_number: int, message: str) -> None:
-        update = Update(update_type=UpdateType.INVALID_ACTION, message=message)
+        update = Update.construct(update_type=UpdateType.INVALID_ACTION, message=message)
         self.update_player(player_number=player_number, update=update)
         return
 
     def update_players(self, update: Update, exclude_player: Optional[int] = None) -> None:
-        for player_number in range(self.number_of_players):
-            if player_number != exclude_player:
-                self.update_player(player_number=player_number, update=update)
+        # serialize a broadcast once and queue the same bytes for every recipient
+        self.queue_for_players(
+            serialized_update=serialize_update(update), exclude_player=exclude_player
+        )
+        return
+
+    def queue_for_players(
+        self, serialized_update: bytes, exclude_player: Optional[int] = None
+    ) -> None:
+        if exclude_player is None:
+            for update_queue in self.update_queues:
+                update_queue.append(serialized_update)
+        else:
+            for player_number, update_queue in enumerate(self.update_queues):
+                if player_number != exclude_player:
+                    update_queue.append(serialized_update)
         return
 
     def update_player(self, player_number: int, update: Update) -> None:
+        # updates are queued and delivered in one message before the player's next request
+        self.update_queues[player_number].append(serialize_update(update))
+        return
 
-        update_json = update.json()
-        body_dict = dict(
-            type="update",
-            recipient=player_number,
-            update=update_json,
-        )
+    def discard_updates(self) -> None:
+        for update_queue in self.update_queues:
+            update_queue.clear()
+        return
 
-        body = json.dumps(body_dict)
+    def flush_updates(self) -> None:
+        messages = []
+        for player_number in range(self.number_of_players):
+            updates_message = self.take_player_updates(player_number=player_number)
+            if updates_message is not None:
+                messages.append(updates_message)
 
-        self.update(body=body)
+        if messages:
+            self.notify(messages=messages)
 
         return
 
+    def take_player_updates(self, player_number: int) -> Optional[RoutedMessage]:
+
+        updates = self.update_queues[player_number]
+        if not updates:
+            return None
+
+        # the queue is reused for the player's next batch rather than replaced
+        payload = serialize_update_batch(updates)
+        updates.clear()
+
+        return (player_number, [UPDATE_MESSAGE, payload])
+
     def request(self, player_number: int, request_type: RequestType) -> Response:
 
-        body_dict = dict(
-            type="request",
-            recipient=player_number,
-            request_type=request_type.name,
+        messages = []
+        updates_message = self.take_player_updates(player_number=player_number)
+        if updates_message is not None:
+            messages.append(updates_message)
+        messages.append(
+            (player_number, [REQUEST_MESSAGE, encode_request(request_type=request_type)])
         )
 
-        body = json.dumps(body_dict)
+        serialized_response = self.update(messages=messages)
+
+        return decode_response(serialized_response)
 
-        serialized_response = self.update(body=body)
+    def notify(self, messages: list[RoutedMessage]) -> None:
 
-        return Response.parse_raw(serialized_response)
+        # the router forwards each message's frames to its player without looking inside them
+        # and only relays a reply for a request, so updates don't wait on the player
+        self.connection.send_bytes(encode_routed_messages(messages))
+        return
 
-    def update(self, body: str) -> str:
+    def update(self, messages: list[RoutedMessage]) -> bytes:
 
-        self.connection.send(body)
-        response = self.connection.recv()
+        self.notify(messages=messages)
+        response = self.connection.recv_bytes()
         return response
@@ -1,33 +1,92 @@
 from copy import deepcopy
-from dataclasses import dataclass
-from multiprocessing.connection import Connection
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
 
 from pydealer import Card, Deck, Stack  # type: ignore
 
-from src.constants import DECK_LEN, TABLE_STACKS
+from src.card_bits import CARD_CODE_BY_NAME, mask_from_stack
+from src.constants import DECK_LEN, HAND_CARDS, TABLE_STACKS
 from src.game import Game
 from src.game_types import Hand, TableStack, Update, UpdateType
 from src.messaging import Messaging
-from src.utilities import build_face_up_table_stack, deserialize_cards, is_card_in_stack, serialize_cards
+from src.utilities import (
+    build_face_up_table_stack,
+    CARD_BY_CODE,
+    copy_stack,
+    deserialize_cards,
+    remove_cards_from_stack,
+    remove_cards_mask_from_stack,
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class Opponent:
-    hand_stack: Stack = Stack()
+    hand_stack: Stack = field(default_factory=Stack)
     hand_count_unknown: int = 0
-    table_stack: Stack = Stack()
+    table_stack: Stack = field(default_factory=Stack)
     table_stacks: int = TABLE_STACKS
+    # card mask of the known hand cards, kept in step by add_cards and remove_cards like Hand's
+    hand_mask: int = 0
+
+    def add_cards(self, cards: Iterable[Card]) -> None:
+        self.hand_stack.cards.extend(cards)
+        self.hand_mask |= mask_from_stack(cards)
+
+    def remove_cards(self, cards_mask: int) -> None:
+        known_cards_mask = cards_mask & self.hand_mask
+        if known_cards_mask:
+            remove_cards_mask_from_stack(stack=self.hand_stack, cards_mask=known_cards_mask)
+            self.hand_mask &= ~known_cards_mask
+        # cards we did not know were in the opponent's hand come out of the unknown count
+        self.hand_count_unknown -= cards_mask.bit_count() - known_cards_mask.bit_count()
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "Opponent":
+        return Opponent(
+            hand_stack=copy_stack(stack=self.hand_stack),
+            hand_count_unknown=self.hand_count_unknown,
+            table_stack=copy_stack(stack=self.table_stack),
+            table_stacks=self.table_stacks,
+            hand_mask=self.hand_mask,
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerHand:
-    hand_stack: Stack = Stack()
-    table_stack: Stack = Stack()
+    hand_stack: Stack = field(default_factory=Stack)
+    table_stack: Stack = field(default_factory=Stack)
     table_stacks: int = TABLE_STACKS
+    # card masks of the stacks, kept in step by the methods below as cards come and go so
+    # choosing a play never has to rescan the stacks
+    hand_mask: int = 0
+    table_mask: int = 0
+
+    def add_cards(self, cards: Iterable[Card]) -> None:
+        self.hand_stack.cards.extend(cards)
+        self.hand_mask |= mask_from_stack(cards)
+
+    def remove_cards(self, cards_mask: int) -> None:
+        remove_cards_mask_from_stack(stack=self.hand_stack, cards_mask=cards_mask)
+        self.hand_mask &= ~cards_mask
+
+    def add_table_cards(self, cards: Iterable[Card]) -> None:
+        self.table_stack.cards.extend(cards)
+        self.table_mask |= mask_from_stack(cards)
+
+    def remove_table_cards(self, cards_mask: int) -> None:
+        remove_cards_mask_from_stack(stack=self.table_stack, cards_mask=cards_mask)
+        self.table_mask &= ~cards_mask
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "PlayerHand":
+        return PlayerHand(
+            hand_stack=copy_stack(stack=self.hand_stack),
+            table_stack=copy_stack(stack=self.table_stack),
+            table_stacks=self.table_stacks,
+            hand_mask=self.hand_mask,
+            table_mask=self.table_mask,
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class GameState:
     deck: Deck
     discard_pile: Stack
@@ -41,6 +100,21 @@ class GameState:
 
 
 class PlayerState:
+    __slots__ = (
+        "deck_length",
+        "discard_pile",
+        "eliminated_cards",
+        "hand",
+        "last_play",
+        "number_of_players",
+        "opponents",
+        "own_update_state_functions",
+        "player_number",
+        "table_cards_set",
+        "update_state_functions",
+        "win",
+    )
+
     def __init__(self, player_number: int) -> None:
 
         self.player_number = player_number
@@ -51,95 +125,75 @@ class PlayerState:
         self.discard_pile: Stack
         self.win: Optional[int]
 
-        self.update_state_functions = {
+        self.update_state_functions: dict[UpdateType, Callable[..., None]] = {
             UpdateType.GAME_INITIATED: self.build_state,
             UpdateType.DECK_DEPLETED: self.assert_deck_empty,
-            UpdateType.PLAYER_WINS: self.set_player_wins,
+            UpdateType.PLAYER_WINS: self.opponent_wins,
             UpdateType.YOU_DREW_CARD: self.you_drew_card,
             UpdateType.PLAYER_DREW_CARD: self.player_drew_card,
+            UpdateType.INITIAL_DEAL: self.initial_deal,
             UpdateType.YOU_PICKED_UP_DISCARD_PILE: self.you_picked_up_discard_pile,
             UpdateType.PLAYER_PICKED_UP_DISCARD_PILE: self.opponent_picked_up_discard_pile,
             UpdateType.BURN_DISCARD_PILE: self.burn_discard_pile,
-            UpdateType.PLAY_FROM_HAND: self.play_from_hand,
-            UpdateType.PLAY_FROM_TABLE: self.play_from_table,
-            UpdateType.PLAY_FROM_FACEDOWN_SUCCESS: self.play_from_facedown_success,
-            UpdateType.PLAY_FROM_FACEDOWN_FAILURE: self.play_from_facedown_failure,
-            UpdateType.PLAY_FROM_FACEUP_FAILURE: self.play_from_faceup_failure,
-            UpdateType.SET_TABLE_CARDS: self.set_table_cards,
+            UpdateType.PLAY_FROM_HAND: self.opponent_played_from_hand,
+            UpdateType.PLAY_FROM_TABLE: self.opponent_played_from_table,
+            UpdateType.PLAY_FROM_FACEDOWN_SUCCESS: self.opponent_played_from_facedown_success,
+            UpdateType.PLAY_FROM_FACEDOWN_FAILURE: self.opponent_played_from_facedown_failure,
+            UpdateType.PLAY_FROM_FACEUP_FAILURE: self.opponent_played_from_faceup_failure,
+            UpdateType.SET_TABLE_CARDS: self.opponent_set_table_cards,
+        }
+
+        # updates about this player's own moves go to handlers that need no player number
+        self.own_update_state_functions: dict[UpdateType, Callable[..., None]] = {
+            UpdateType.PLAYER_WINS: self.you_win,
+            UpdateType.PLAY_FROM_HAND: self.you_played_from_hand,
+            UpdateType.PLAY_FROM_TABLE: self.you_played_from_table,
+            UpdateType.PLAY_FROM_FACEDOWN_SUCCESS: self.you_played_from_facedown_success,
+            UpdateType.PLAY_FROM_FACEDOWN_FAILURE: self.you_played_from_facedown_failure,
+            UpdateType.PLAY_FROM_FACEUP_FAILURE: self.you_played_from_faceup_failure,
+            UpdateType.SET_TABLE_CARDS: self.you_set_table_cards,
         }
 
     def update_state(self, update: Update) -> None:
 
-        player_number: Optional[int] = getattr(update, "player_number", None)
-        number_of_players: Optional[int] = getattr(update, "number_of_players", None)
-        if getattr(update, "cards", None) is not None:
-            assert update.cards is not None
-            cards = deserialize_cards(encoded_cards=update.cards)
-
-        if update.update_type == UpdateType.GAME_INITIATED:
-            assert number_of_players is not None
-            self.build_state(number_of_players=number_of_players)
-        elif update.update_type == UpdateType.DECK_DEPLETED:
-            self.assert_deck_empty()
-        elif update.update_type == UpdateType.PLAYER_WINS:
-            assert player_number is not None
-            self.set_player_wins(player_number=player_number)
-        elif update.update_type == UpdateType.YOU_DREW_CARD:
-            assert cards is not None
-            self.you_drew_card(cards=cards)
-        elif update.update_type == UpdateType.PLAYER_DREW_CARD:
-            assert player_number is not None
-            self.player_drew_card(player_number=player_number)
-        elif update.update_type == UpdateType.YOU_PICKED_UP_DISCARD_PILE:
-            assert cards is not None
-            self.you_picked_up_discard_pile(cards=cards)
-        elif update.update_type == UpdateType.PLAYER_PICKED_UP_DISCARD_PILE:
-            assert player_number is not None
-            self.opponent_picked_up_discard_pile(player_number=player_number)
-        elif update.update_type == UpdateType.BURN_DISCARD_PILE:
-            self.burn_discard_pile()
-        elif update.update_type == UpdateType.PLAY_FROM_HAND:
-            assert player_number is not None
-            assert cards is not None
-            self.play_from_hand(player_number=player_number, cards=cards)
-        elif update.update_type == UpdateType.PLAY_FROM_TABLE:
-            assert player_number is not None
-            assert cards is not None
-            self.play_from_table(player_number=player_number, cards=cards)
-        elif update.update_type == UpdateType.PLAY_FROM_FACEDOWN_SUCCESS:
-            assert player_number is not None
-            assert cards is not None
-            self.play_from_facedown_success(player_number=player_number, cards=cards)
-        elif update.update_type == UpdateType.PLAY_FROM_FACEDOWN_FAILURE:
-            assert player_number is not None
-            assert cards is not None
-            self.play_from_facedown_failure(player_number=player_number, cards=cards)
-        elif update.update_type == UpdateType.PLAY_FROM_FACEUP_FAILURE:
-            assert player_number is not None
-            assert cards is not None
-            self.play_from_faceup_failure(player_number=player_number, cards=cards)
-        elif update.update_type == UpdateType.SET_TABLE_CARDS:
-            assert player_number is not None
-            assert cards is not None
-            self.set_table_cards(player_number=player_number, cards=cards)
-
-        self.assert_conservation_of_cards()
-
-    def assert_conservation_of_cards(self) -> int:
+        # every update carries exactly the fields its handler takes, so pass the ones present
+        kwargs: dict[str, Any] = {}
+        if update.player_number == self.player_number:
+            update_function = self.own_update_state_functions.get(update.update_type)
+        else:
+            update_function = self.update_state_functions.get(update.update_type)
+            if update.player_number is not None:
+                kwargs["player_number"] = update.player_number
+        if update_function is not None:
+            if update.number_of_players is not None:
+                kwargs["number_of_players"] = update.number_of_players
+            if update.cards is not None:
+                kwargs["cards"] = deserialize_cards(encoded_cards=update.cards)
+            update_function(**kwargs)
+
+        if __debug__:
+            self.assert_conservation_of_cards()
+
+    def assert_conservation_of_cards(self) -> None:
         common_cards = self.deck_length + len(self.discard_pile) + len(self.eliminated_cards)
         player_cards = (
             len(self.hand.hand_stack) + len(self.hand.table_stack) + self.hand.table_stacks
         )
-        opponent_cards = 0
-        for opponent in self.opponents.values():
-            opponent_cards += (
+        opponent_cards = sum(
+            [
                 len(opponent.hand_stack)
                 + len(opponent.table_stack)
                 + opponent.table_stacks
                 + opponent.hand_count_unknown
-            )
+                for opponent in self.opponents.values()
+            ]
+        )
 
         assert common_cards + player_cards + opponent_cards == DECK_LEN
+        assert self.hand.hand_mask == mask_from_stack(self.hand.hand_stack)
+        assert self.hand.table_mask == mask_from_stack(self.hand.table_stack)
+        for opponent in self.opponents.values():
+            assert opponent.hand_mask == mask_from_stack(opponent.hand_stack)
 
     def build_state(self, number_of_players: int) -> None:
         self.number_of_players = number_of_players
@@ -160,129 +214,110 @@ class PlayerState:
     def assert_deck_empty(self) -> None:
         assert self.deck_length == 0
 
-    def set_player_wins(self, player_number: int) -> None:
-        if player_number == self.player_number:
-            self.win = 1
-        else:
-            self.win = 0
+    def you_win(self) -> None:
+        self.win = 1
+
+    def opponent_wins(self, player_number: int) -> None:
+        self.win = 0
 
     def you_drew_card(self, cards: Stack) -> None:
         self.deck_length -= 1
-        self.add_cards_to_hand(cards=cards)
+        self.hand.add_cards(cards=cards)
 
     def player_drew_card(self, player_number: int) -> None:
         self.deck_length -= 1
         self.opponents[player_number].hand_count_unknown += 1
 
+    def initial_deal(self, cards: Stack) -> None:
+        # every player is dealt the same number of hand cards, so the opponents' counts follow
+        dealt_cards = HAND_CARDS + TABLE_STACKS
+        self.deck_length -= dealt_cards * self.number_of_players
+        self.hand.add_cards(cards=cards)
+        for opponent in self.opponents.values():
+            opponent.hand_count_unknown += dealt_cards
+
     def you_picked_up_discard_pile(self, cards: Stack) -> None:
-        self.add_cards_to_hand(cards=cards)
-        self.discard_pile.empty()
+        self.hand.add_cards(cards=cards)
+        self.discard_pile.cards.clear()
         self.last_play = None
 
     def opponent_picked_up_discard_pile(self, player_number: int) -> None:
-        cards_list = self.discard_pile.empty(return_cards=True)
-        cards = Stack(cards=cards_list)
-        self.opponents[player_number].hand_stack += cards
+        self.opponents[player_number].add_cards(cards=self.discard_pile.cards)
+        self.discard_pile.cards.clear()
         self.last_play = None
 
     def burn_discard_pile(self) -> None:
-        cards_list = self.discard_pile.empty(return_cards=True)
-        cards = Stack(cards=cards_list)
-        self.eliminated_cards += cards
+        # eliminated_cards can be shared between simulated player states, so it is replaced
+        # rather than extended
+        self.eliminated_cards += self.discard_pile
+        self.discard_pile.cards.clear()
         self.last_play = None
 
-    def play_from_hand(self, player_number: int, cards: Stack) -> None:
+    def discard(self, cards: Stack) -> None:
         self.last_play = cards
         self.discard_pile += cards
 
-        if player_number == self.player_number:
-            self.remove_cards_from_hand(cards=cards)
-        else:
-            self.remove_cards_from_opponent(player_number=player_number, cards=cards)
-
-    def add_cards_to_hand(self, cards: Stack) -> None:
-        self.hand.hand_stack += cards
+    def you_played_from_hand(self, cards: Stack) -> None:
+        self.discard(cards=cards)
+        self.hand.remove_cards(cards_mask=mask_from_stack(cards))
 
-    def remove_cards_from_hand(self, cards: Stack) -> None:
-        for card in cards:
-            self.hand.hand_stack.get(card.name)
-
-    def remove_cards_from_opponent(self, player_number: int, cards: Stack) -> None:
-        number_of_cards_to_remove = len(cards)
-        for card in cards:
-            # if card in self.opponents[player_number].hand_stack:
-            if is_card_in_stack(card=card, stack=self.opponents[player_number].hand_stack):
-                self.opponents[player_number].hand_stack.get(card.name)
-                number_of_cards_to_remove -= 1
-        self.opponents[player_number].hand_count_unknown -= number_of_cards_to_remove
-
-    def play_from_table(self, player_number: int, cards: Stack) -> None:
-        self.last_play = cards
-        self.discard_pile += cards
+    def opponent_played_from_hand(self, player_number: int, cards: Stack) -> None:
+        self.discard(cards=cards)
+        self.opponents[player_number].remove_cards(cards_mask=mask_from_stack(cards))
 
-        if player_number == self.player_number:
-            self.remove_cards_from_table(cards=cards)
-        else:
-            self.remove_cards_from_opponent_table(player_number=player_number, cards=cards)
+    def you_played_from_table(self, cards: Stack) -> None:
+        self.discard(cards=cards)
+        self.hand.remove_table_cards(cards_mask=mask_from_stack(cards))
 
-    def remove_cards_from_table(self, cards: Stack) -> None:
-        for card in cards:
-            self.hand.table_stack.get(card.name)
+    def opponent_played_from_table(self, player_number: int, cards: Stack) -> None:
+        self.discard(cards=cards)
+        self.remove_cards_from_opponent_table(player_number=player_number, cards=cards)
 
     def remove_cards_from_opponent_table(self, player_number: int, cards: Stack) -> None:
-        for card in cards:
-            self.opponents[player_number].table_stack.get(card.name)
+        remove_cards_from_stack(stack=self.opponents[player_number].table_stack, cards=cards)
 
-    def play_from_facedown_success(self, player_number: int, cards: Stack) -> None:
-        self.last_play = cards
-        self.discard_pile += cards
+    def you_played_from_facedown_success(self, cards: Stack) -> None:
+        self.discard(cards=cards)
+        self.hand.table_stacks -= 1
 
-        if player_number == self.player_number:
-            self.hand.table_stacks -= 1
-        else:
-            self.opponents[player_number].table_stacks -= 1
+    def opponent_played_from_facedown_success(self, player_number: int, cards: Stack) -> None:
+        self.discard(cards=cards)
+        self.opponents[player_number].table_stacks -= 1
 
-    def play_from_facedown_failure(self, player_number: int, cards: Stack) -> None:
+    def you_played_from_facedown_failure(self, cards: Stack) -> None:
+        self.hand.add_cards(cards=cards)
+        self.hand.table_stacks -= 1
 
-        if player_number == self.player_number:
-            self.hand.hand_stack += cards
-            self.hand.table_stacks -= 1
-        else:
-            self.opponents[player_number].hand_stack += cards
-            self.opponents[player_number].table_stacks -= 1
+    def opponent_played_from_facedown_failure(self, player_number: int, cards: Stack) -> None:
+        self.opponents[player_number].add_cards(cards=cards)
+        self.opponents[player_number].table_stacks -= 1
 
-    def play_from_faceup_failure(self, player_number: int, cards: Stack) -> None:
+    def you_played_from_faceup_failure(self, cards: Stack) -> None:
+        self.hand.add_cards(cards=cards)
+        self.hand.remove_table_cards(cards_mask=mask_from_stack(cards))
 
-        if player_number == self.player_number:
-            self.hand.hand_stack += cards
-            self.remove_cards_from_table(cards=cards)
-        else:
-            self.opponents[player_number].hand_stack += cards
-            self.remove_cards_from_opponent_table(player_number=player_number, cards=cards)
+    def opponent_played_from_faceup_failure(self, player_number: int, cards: Stack) -> None:
+        self.opponents[player_number].add_cards(cards=cards)
+        self.remove_cards_from_opponent_table(player_number=player_number, cards=cards)
 
-    def set_table_cards(self, player_number: int, cards: Stack) -> None:
+    def you_set_table_cards(self, cards: Stack) -> None:
+        self.hand.add_table_cards(cards=cards)
+        self.hand.remove_cards(cards_mask=mask_from_stack(cards))
+        self.table_cards_set = True
 
-        if player_number == self.player_number:
-            self.hand.table_stack += cards
-            self.remove_cards_from_hand(cards=cards)
-            self.table_cards_set = True
-        else:
-            self.opponents[player_number].table_stack += cards
-            self.opponents[player_number].hand_count_unknown -= len(cards)
+    def opponent_set_table_cards(self, player_number: int, cards: Stack) -> None:
+        opponent = self.opponents[player_number]
+        opponent.table_stack += cards
+        opponent.hand_count_unknown -= len(cards)
 
-    def get_available_cards(self) -> Stack:
-        if len(self.hand.hand_stack) > 0:
-            return self.hand.hand_stack
-        else:
-            return self.hand.table_stack
+    def get_available_cards_mask(self) -> int:
+        return self.hand.hand_mask or self.hand.table_mask
 
     def get_hand_cards_list(self) -> list[str]:
-        serialized_hand_cards = serialize_cards(cards=self.hand.hand_stack)
-        return serialized_hand_cards.split(",")
+        return [CARD_CODE_BY_NAME[card.name] for card in self.hand.hand_stack.cards]
 
     def get_table_cards_list(self) -> list[str]:
-        serialized_table_cards = serialize_cards(cards=self.hand.table_stack)
-        return serialized_table_cards.split(",")
+        return [CARD_CODE_BY_NAME[card.name] for card in self.hand.table_stack.cards]
 
     def get_last_play(self) -> Optional[Stack]:
         return self.last_play
@@ -297,20 +332,13 @@ class PlayerState:
         The purpose is then the player can use the game object for simulation.
         """
 
-        deck = Deck()
-        deck.shuffle()
-
-        table_stacks: list[TableStack]
-
         # set known cards
-        # known cards have to be set before unknown cards so we know what to remove from the deck
-        discard_pile = deepcopy(self.discard_pile)
-        for card in self.discard_pile:
-            deck.get(card.name)
-
-        eliminated_cards = deepcopy(self.eliminated_cards)
-        for card in self.eliminated_cards:
-            deck.get(card.name)
+        # known cards have to be set before unknown cards so we know what to leave out of the deck;
+        # they are gathered into one mask so the deck is filtered in a single pass
+        discard_pile = copy_stack(stack=self.discard_pile)
+        eliminated_cards = copy_stack(stack=self.eliminated_cards)
+        known_cards_mask = mask_from_stack(self.discard_pile)
+        known_cards_mask |= mask_from_stack(self.eliminated_cards)
 
         number_of_players = self.number_of_players
         last_play = self.last_play
@@ -318,62 +346,44 @@ class PlayerState:
         table_cards_set = self.table_cards_set
 
         player_hands: list[Hand] = [Hand() for i in range(number_of_players)]
+        # (table stack count, known top cards) for each player
+        player_table_cards: list[tuple[int, Stack]] = []
 
         for player_number in range(self.number_of_players):
 
             if player_number == self.player_number:
 
-                player_hands[player_number].hand_stack = deepcopy(self.hand.hand_stack)
-                for card in self.hand.hand_stack:
-                    deck.get(card.name)
-
-                table_stacks = []
-                for table_stack_number in range(self.hand.table_stacks):
-                    table_stack = TableStack(
-                        top_card=None,
-                        bottom_card=Card(suit="Spades", value="Ace"),  # this is a dummy card
-                    )
-                    table_stacks.append(table_stack)
-
-                for i, card in enumerate(self.hand.table_stack):
-                    table_stacks[i].top_card = card
-                    deck.get(card.name)
-
-                player_hands[player_number].table_stacks = table_stacks
+                player_hands[player_number].add_cards(cards=self.hand.hand_stack)
+                known_cards_mask |= self.hand.hand_mask | self.hand.table_mask
+                player_table_cards.append((self.hand.table_stacks, self.hand.table_stack))
 
             else:
 
-                player_hands[player_number].hand_stack = deepcopy(
-                    self.opponents[player_number].hand_stack
-                )
-                for card in self.opponents[player_number].hand_stack:
-                    deck.get(card.name)
+                opponent = self.opponents[player_number]
 
-                table_stacks = []
-                for table_stack_number in range(self.opponents[player_number].table_stacks):
-                    table_stack = TableStack(
-                        top_card=None,
-                        bottom_card=Card(suit="Spades", value="Ace"),  # this is a dummy card
-                    )
-                    table_stacks.append(table_stack)
+                player_hands[player_number].add_cards(cards=opponent.hand_stack)
+                known_cards_mask |= opponent.hand_mask | mask_from_stack(opponent.table_stack)
+                player_table_cards.append((opponent.table_stacks, opponent.table_stack))
 
-                for i, card in enumerate(self.opponents[player_number].table_stack):
-                    table_stacks[i].top_card = card
-                    deck.get(card.name)
-
-                player_hands[player_number].table_stacks = table_stacks
+        deck = Deck(cards=CARD_BY_CODE.values(), build=False)
+        remove_cards_mask_from_stack(stack=deck, cards_mask=known_cards_mask)
+        deck.shuffle()
 
         # set unknown cards
+        # table stacks are only built now, so each gets its dealt bottom card straight away
         for player_number in range(self.number_of_players):
 
-            for table_stack in player_hands[player_number].table_stacks:
-                card_list = deck.deal(num=1)
-                table_stack.bottom_card = card_list[0]
+            table_stacks, top_cards = player_table_cards[player_number]
+            top_cards_list: list[Optional[Card]] = list(top_cards.cards)
+            top_cards_list += [None] * (table_stacks - len(top_cards_list))
+            player_hands[player_number].table_stacks = [
+                TableStack(bottom_card=deck.deal(num=1)[0], top_card=top_card)
+                for top_card in top_cards_list
+            ]
 
             if player_number != self.player_number:
-                card_list = deck.deal(num=self.opponents[player_number].hand_count_unknown)
-                card_stack = Stack(cards=card_list)
-                player_hands[player_number].hand_stack += card_stack
+                card_stack = deck.deal(num=self.opponents[player_number].hand_count_unknown)
+                player_hands[player_number].add_cards(cards=card_stack)
 
         assert len(deck) == self.deck_length
 
@@ -402,38 +412,43 @@ def build_player_states(game_state: GameState) -> list[PlayerState]:
         opponent.table_stacks = len(player_hand.table_stacks)
         opponents[i] = opponent
 
+    # a burn gives a player state a new eliminated_cards stack, so until then they share one
+    eliminated_cards = copy_stack(stack=game_state.eliminated_cards)
+
     player_states: list[PlayerState] = []
 
     for i, player_hand in enumerate(game_state.player_hands):
 
         player_state = PlayerState(player_number=i)
 
-        player_state.discard_pile = deepcopy(game_state.discard_pile)
+        player_state.discard_pile = copy_stack(stack=game_state.discard_pile)
         player_state.last_play = game_state.last_play
-        player_state.eliminated_cards = deepcopy(game_state.eliminated_cards)
+        player_state.eliminated_cards = eliminated_cards
         player_state.deck_length = len(game_state.deck)
         player_state.win = None
         player_state.number_of_players = game_state.number_of_players
         player_state.table_cards_set = game_state.table_cards_set
 
-        player_state.opponents = deepcopy(opponents)
+        player_state.opponents = {
+            opponent_number: deepcopy(opponent)
+            for opponent_number, opponent in opponents.items()
+            if opponent_number != i
+        }
 
-        del player_state.opponents[i]
-        player_state.hand = PlayerHand()
-        player_state.hand.hand_stack = deepcopy(player_hand.hand_stack)
-        player_state.hand.table_stack = build_face_up_table_stack(
-            table_stacks=player_hand.table_stacks
+        player_state.hand = PlayerHand(table_stacks=len(player_hand.table_stacks))
+        player_state.hand.add_cards(cards=player_hand.hand_stack)
+        player_state.hand.add_table_cards(
+            cards=build_face_up_table_stack(table_stacks=player_hand.table_stacks)
         )
-        player_state.hand.table_stacks = len(player_hand.table_stacks)
 
-        player_state.assert_conservation_of_cards()
+        if __debug__:
+            player_state.assert_conservation_of_cards()
         player_states.append(player_state)
 
     return player_states
 
 
-def build_game(game_state: GameState, connection: Connection) -> Game:
-    messaging = Messaging(number_of_players=game_state.number_of_players, connection=connection)
+def build_game(game_state: GameState, messaging: Messaging) -> Game:
     game = Game(number_of_players=game_state.number_of_players, messaging=messaging)
     game.deck = game_state.deck
     game.discard_pile = game_state.discard_pile
@@ -444,6 +459,10 @@ def build_game(game_state: GameState, connection: Connection) -> Game:
     game.player_turn = game_state.player_turn
     game.win = game_state.win
     game.table_cards_set = game_state.table_cards_set
-    game.assert_conservation_of_cards()
+    if __debug__:
+        game.assert_conservation_of_cards()
+    # players are built from the same game state, so the GAME_INITIATED updates queued by
+    # Game() would reset them
+    messaging.discard_updates()
 
     return game
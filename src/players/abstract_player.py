@@ -1,12 +1,22 @@
-import json
 import logging
 from abc import ABC, abstractmethod
+from typing import Callable
 
+import orjson
 import zmq
 
-from src.game_types import Update
+from src.endpoints import player_bind_endpoint
+from src.game_types import RequestType, Update
 from src.player_state import PlayerState
-from src.utilities import get_available_plays_from_stack
+from src.utilities import get_available_plays_from_cards_mask
+from src.wire import (
+    decode_request,
+    decode_update,
+    EncodedResponse,
+    REQUEST_MESSAGE,
+    RESPONSE_BUFFER_SIZE,
+    UPDATE_MESSAGE,
+)
 
 logger = logging.getLogger(__name__, )
 logger.setLevel(level=logging.INFO)
@@ -16,52 +26,64 @@ class Player(ABC):
     def __init__(self, player_number: int, suppress_logs: bool = False) -> None:
         self.socket: zmq.Socket
         self.state = PlayerState(player_number=player_number)
+        self.send_buffer = bytearray(RESPONSE_BUFFER_SIZE)
+        self.communication_functions: dict[bytes, Callable[[bytes], EncodedResponse]] = {
+            UPDATE_MESSAGE: self.handle_update,
+            REQUEST_MESSAGE: self.respond_to_request,
+        }
         if suppress_logs:
             logger.setLevel(level=logging.ERROR)
 
     def bind_to_socket(
         self,
     ) -> None:
-        context = zmq.Context()
+        context: zmq.Context = zmq.Context.instance()
         self.socket = context.socket(zmq.REP)
-        self.socket.bind("tcp://*:5000")
-        logger.info("Bound to port 5000")
+        endpoint = player_bind_endpoint(player_number=self.state.player_number)
+        self.socket.bind(endpoint)
+        logger.info("Bound to %s", endpoint)
 
     def run_communication_loop(self) -> None:
 
         while True:
-            message = self.socket.recv()
-            response = self.handle_communication(message=message)
-            self.socket.send_string(response)
-
-    def handle_communication(self, message: bytes) -> str:
-        message_dict = json.loads(message)
-        if message_dict["type"] == "update":
-            self.handle_update(message_dict=message_dict)
-            response = ""
-        elif message_dict["type"] == "request":
-            logger.info("Request received")
-            response = self.handle_request(message_dict=message_dict)
-            logger.info("Sending response")
-
+            # a request can arrive together with the updates queued ahead of it
+            frames = self.socket.recv_multipart()
+            for i in range(0, len(frames), 2):
+                response = self.handle_communication(kind=frames[i], payload=frames[i + 1])
+            self.socket.send(response, copy=False)
+
+    def close(self) -> None:
+        # releases anything the player holds beyond its socket; most players hold nothing
+        return
+
+    def handle_communication(self, kind: bytes, payload: bytes) -> EncodedResponse:
+        return self.communication_functions[kind](payload)
+
+    def handle_update(self, payload: bytes) -> EncodedResponse:
+        for encoded_update in orjson.loads(payload):
+            update = decode_update(encoded_update)
+            self.state.update_state(update=update)
+            if logger.isEnabledFor(logging.INFO):
+                print_update(update=update)
+        return b""
+
+    def respond_to_request(self, payload: bytes) -> EncodedResponse:
+        logger.info("Request received")
+        response = self.handle_request(request_type=decode_request(payload))
+        logger.info("Sending response")
         return response
 
-    def handle_update(self, message_dict: dict) -> None:
-        update = Update.parse_raw(message_dict["update"])
-        self.state.update_state(update=update)
-        print_update(update=update)
-
     def get_available_plays(self) -> list[str]:
-        available_cards = self.state.get_available_cards()
+        available_cards_mask = self.state.get_available_cards_mask()
         last_play = self.state.get_last_play()
         discard_pile = self.state.get_discard_pile()
-        available_plays = get_available_plays_from_stack(
-            stack=available_cards, last_play=last_play, discard_pile=discard_pile
+        available_plays = get_available_plays_from_cards_mask(
+            cards_mask=available_cards_mask, last_play=last_play, discard_pile=discard_pile
         )
         return list(available_plays)
 
     @abstractmethod
-    def handle_request(self, message_dict: dict) -> str:
+    def handle_request(self, request_type: RequestType) -> EncodedResponse:
         raise NotImplementedError("Method not implemented")
 
 
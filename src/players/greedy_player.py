@@ -1,4 +1,4 @@
-from src.constants import PLAY_RANKS
+from src.constants import CARD_RANK, RANK_BY_ORD
 from src.players.computer_player import ComputerPlayer
 
 
@@ -18,10 +18,10 @@ class GreedyPlayer(ComputerPlayer):
 
 
 def greedy_select_table_cards(card_list: list[str]) -> str:
-    card_list.sort(key=lambda c: PLAY_RANKS[c[1]], reverse=True)
+    card_list.sort(key=CARD_RANK.__getitem__, reverse=True)
     return ",".join(card_list[:3])
 
 
 def greedy_select_play(available_plays: list[str]) -> str:
-    available_plays.sort(key=lambda c: (PLAY_RANKS[c[1]], -len(c)))
-    return available_plays[0]
+    # min keeps the first of equal keys, just as the first element of a stable sort would
+    return min(available_plays, key=lambda c: (RANK_BY_ORD[ord(c[1])], -len(c)))
@@ -1,19 +1,20 @@
 import logging
 
-from src.constants import PLAY_RANKS, TABLE_STACKS
-from src.game_types import Action, Response
+from src.constants import CARD_RANK, TABLE_STACKS
+from src.game_types import Action, RequestType, Response
 from src.players.abstract_player import Player
+from src.wire import encode_response, EncodedResponse
 
 logging.basicConfig(level=logging.INFO)
 
 
 class HumanPlayer(Player):
-    def handle_request(self, message_dict: dict) -> str:
+    def handle_request(self, request_type: RequestType) -> EncodedResponse:
 
-        if message_dict["request_type"] == "SET_TABLE_CARDS":
+        if request_type == RequestType.SET_TABLE_CARDS:
             encoded_cards = input(f"Set your {TABLE_STACKS} table cards, i.e. 'HQ,ST,S9'\n")
             response = Response(action=Action.SET_TABLE_CARDS, cards=encoded_cards)
-        elif message_dict["request_type"] == "PLAY":
+        elif request_type == RequestType.PLAY:
             logging.info("It's your turn!")
             self.print_hand()
             play = input(
@@ -24,12 +25,12 @@ class HumanPlayer(Player):
             else:
                 response = Response(action=Action.PLAY_KNOWN_CARDS, cards=play)
 
-        return response.json()
+        return encode_response(response=response, buffer=self.send_buffer)
 
     def print_hand(self) -> None:
         hand_cards = self.state.get_hand_cards_list()
         table_cards = self.state.get_table_cards_list()
-        hand_cards.sort(key=lambda x: PLAY_RANKS[x[1]])
-        table_cards.sort(key=lambda x: PLAY_RANKS[x[1]])
-        logging.info(f"Hand cards: {hand_cards}")
-        logging.info(f"Table cards: {table_cards}")
+        hand_cards.sort(key=CARD_RANK.__getitem__)
+        table_cards.sort(key=CARD_RANK.__getitem__)
+        logging.info("Hand cards: %s", hand_cards)
+        logging.info("Table cards: %s", table_cards)
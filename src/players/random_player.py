@@ -1,5 +1,4 @@
-from itertools import combinations
-from random import randint
+from random import randrange, sample
 
 from src.constants import TABLE_STACKS
 from src.players.computer_player import ComputerPlayer
@@ -8,21 +7,14 @@ from src.players.computer_player import ComputerPlayer
 class RandomPlayer(ComputerPlayer):
     def set_table_cards(self) -> str:
         hand_cards = self.state.get_hand_cards_list()
-        card_combinations = [
-            ",".join(combination) for combination in combinations(hand_cards, TABLE_STACKS)
-        ]
-        chosen_combination = pick_one(options=card_combinations)
-        return chosen_combination
+        chosen_cards = sample(hand_cards, TABLE_STACKS)
+        return ",".join(chosen_cards)
 
     def play(self) -> str:
-        options = []
-        if self.state.get_last_play() is not None:
-            options.append("1")
         available_plays = self.get_available_plays()
-        options += available_plays
-        return pick_one(options=options)
-
-
-def pick_one(options: list[str]) -> str:
-    chosen_index = randint(0, len(options) - 1)
-    return options[chosen_index]
+        # picking up the discard pile ("1") is an extra option whenever there is a last play
+        pick_up_options = 0 if self.state.get_last_play() is None else 1
+        chosen_index = randrange(len(available_plays) + pick_up_options) - pick_up_options
+        if chosen_index < 0:
+            return "1"
+        return available_plays[chosen_index]
@@ -1,26 +1,65 @@
-import json
 import logging
+import multiprocessing
+import os
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+from heapq import nlargest
 from itertools import combinations
-from multiprocessing import Pipe, Process
-from multiprocessing.connection import Connection
+from typing import Optional
 
-from src.constants import TABLE_STACKS
-from src.game_types import Action, Response
+from src.constants import CARD_RANK, TABLE_STACKS
+from src.game_types import Action, RequestType, Response
+from src.messaging import Messaging
 from src.player_state import build_game, build_player_states, GameState, PlayerState
 from src.players.computer_player import ComputerPlayer
 from src.players.greedy_player import GreedyPlayer
+from src.wire import RoutedMessage
 
 logging.basicConfig(level=logging.INFO)
 
+# a simulated game is abandoned after about this many messages; each turn sends one request
+# plus an update for every player
+MAX_SIMULATED_MESSAGES = 600
+
+# candidate plays are tested on at most this many worker processes
+MAX_ROLLOUT_WORKERS = 4
+
+SIMULATED_PLAYERS: dict[tuple[type[ComputerPlayer], int], list[ComputerPlayer]] = {}
+
 
 class SimpleMCTS(ComputerPlayer):
     # One Layer Uniform Distribution Monte Carlo Tree Search
 
+    # only the table card combinations with the highest total rank are searched
+    TABLE_CARD_OPTIONS = 5
+
+    def __init__(self, player_number: int, suppress_logs: bool = False) -> None:
+        super().__init__(player_number=player_number, suppress_logs=suppress_logs)
+        # the candidate plays are tested side by side; workers start on the first search and
+        # are kept for the rest of the game, each with its own random seed. They come from a
+        # forkserver, since forking this process would copy it mid-flight with zmq's threads
+        # running. On a single core the search stays in process.
+        self.executor: Optional[Executor] = None
+        max_workers = min(MAX_ROLLOUT_WORKERS, os.cpu_count() or 1)
+        if max_workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=random.seed,
+            )
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+
     def set_table_cards(self) -> str:
         hand_cards = self.state.get_hand_cards_list()
-        card_combinations = [
-            ",".join(combination) for combination in combinations(hand_cards, TABLE_STACKS)
-        ]
+        best_combinations = nlargest(
+            self.TABLE_CARD_OPTIONS,
+            combinations(hand_cards, TABLE_STACKS),
+            key=lambda combination: sum([CARD_RANK[card] for card in combination]),
+        )
+        card_combinations = [",".join(combination) for combination in best_combinations]
 
         if self.state.deck_length < 10:
             iterations = 30
@@ -28,7 +67,10 @@ class SimpleMCTS(ComputerPlayer):
             iterations = 5
 
         chosen_cards = uniform_monte_carlo_tree_search(
-            player_state=self.state, iterations=iterations, play_options=card_combinations
+            player_state=self.state,
+            iterations=iterations,
+            play_options=card_combinations,
+            executor=self.executor,
         )
         return chosen_cards
 
@@ -45,32 +87,48 @@ class SimpleMCTS(ComputerPlayer):
             iterations = 5
 
         chosen_play = uniform_monte_carlo_tree_search(
-            player_state=self.state, iterations=iterations, play_options=options
+            player_state=self.state,
+            iterations=iterations,
+            play_options=options,
+            executor=self.executor,
         )
         return chosen_play
 
 
 def uniform_monte_carlo_tree_search(
-    player_state: PlayerState, iterations: int, play_options: list[str]
+    player_state: PlayerState,
+    iterations: int,
+    play_options: list[str],
+    executor: Optional[Executor] = None,
 ) -> str:
 
     win_pct: float = 0
     chosen_play = play_options[0]
-    logging.info(f"test plays {play_options} with {iterations} iterations")
+    logging.info("test plays %s with %s iterations", play_options, iterations)
 
     if len(play_options) > 1:
-        for play in play_options:
-            play_win_pct = test_play(
-                player_state=player_state,
-                iterations=iterations,
-                play=play,
-            )
-            logging.info(f"play {play} wins {round(play_win_pct, 3)}")
+        if executor is None:
+            play_win_pcts = [
+                test_play(player_state=player_state, iterations=iterations, play=play)
+                for play in play_options
+            ]
+        else:
+            futures = [
+                executor.submit(
+                    test_play, player_state=player_state, iterations=iterations, play=play
+                )
+                for play in play_options
+            ]
+            play_win_pcts = [future.result() for future in futures]
+
+        # results are taken in option order, so ties go to the earliest option
+        for play, play_win_pct in zip(play_options, play_win_pcts):
+            logging.info("play %s wins %.3f", play, play_win_pct)
             if play_win_pct > win_pct:
                 win_pct = play_win_pct
                 chosen_play = play
 
-    logging.info(f"choosing play {chosen_play}")
+    logging.info("choosing play %s", chosen_play)
     return chosen_play
 
 
@@ -97,82 +155,97 @@ def simulate(
     player_number = player_state.player_number
 
     game_state = player_state.create_game_state()
-    connection_main, connection_game = Pipe(duplex=True)
     players = create_players(game_state=game_state, player_class=GreedyPlayer)
+    messaging = SimulatedMessaging(
+        number_of_players=game_state.number_of_players, players=players, play=play
+    )
+    game = build_game(game_state=game_state, messaging=messaging)
 
-    game_process = Process(target=simulate_game, args=(game_state, connection_game, player_state.player_number))
-    game_process.start()
-
-    # play chosen play
-    while True:
-        message = connection_main.recv()
-        message_dict = json.loads(message)
-        if message_dict["type"] == "update":
-            connection_main.send("")
-        elif message_dict["type"] == "request":
-            assert message_dict["recipient"] == player_number
-            if message_dict["request_type"] == "SET_TABLE_CARDS":
-                response = Response(action=Action.SET_TABLE_CARDS, cards=play)
-            elif play == "1":
-                response = Response(action=Action.PICK_UP_DISCARD_PILE)
-            else:
-                response = Response(action=Action.PLAY_KNOWN_CARDS, cards=play)
-            connection_main.send(response.json())
-            break
-        else:
-            raise Exception(f"message type invalid {message_dict}")
+    if game.table_cards_set is False:
+        game.set_table_cards(start_player_number=player_number)
 
-    # simulate rest of game
-    i = 0
-    while route_communication(connection=connection_main, players=players, play=play):
-        i += 1
-        if i > 600:
-            # game simulation probably stuck in loop. Break
-            game_process.terminate()
-            logging.debug("Breaking iteration")
-            break
+    # Game.run one play attempt at a time: greedy players can keep passing the discard pile
+    # back and forth, so a game still going after MAX_SIMULATED_MESSAGES counts as a loss
+    max_plays = MAX_SIMULATED_MESSAGES // (2 * game_state.number_of_players + 1)
+    plays = 0
+    while game.win is None and plays < max_plays:
+        valid_play = game.get_valid_play(player_number=game.player_turn)
+        if __debug__ and valid_play:
+            game.assert_conservation_of_cards()
+        plays += 1
 
-    game_process.join()
+    if game.win is None:
+        logging.debug("Breaking iteration")
 
-    return players[player_number].state.win == player_number
+    return game.win == player_number
 
 
 def create_players(
     game_state: GameState, player_class: type[ComputerPlayer]
 ) -> list[ComputerPlayer]:
     player_states = build_player_states(game_state=game_state)
-    players = [player_class(player_number=i, suppress_logs=True) for i in range(game_state.number_of_players)]
+    # simulations run one after another and a player keeps nothing beyond its state, so the
+    # simulated players are built once per seat count and handed fresh states each time
+    players_key = (player_class, game_state.number_of_players)
+    players = SIMULATED_PLAYERS.get(players_key)
+    if players is None:
+        players = [
+            player_class(player_number=i, suppress_logs=True)
+            for i in range(game_state.number_of_players)
+        ]
+        SIMULATED_PLAYERS[players_key] = players
     for i in range(game_state.number_of_players):
         players[i].state = player_states[i]
     return players
 
 
-def simulate_game(
-    game_state: GameState,
-    connection_game: Connection,
-    player_number: int,
-) -> None:
+class SimulatedMessaging(Messaging):
+    """
+    Hands the game's messages straight to the simulated players in this process rather than
+    sending them over a connection, and answers the first request with the play being tested
+    """
 
-    game = build_game(game_state=game_state, connection=connection_game)
+    def __init__(
+        self,
+        number_of_players: int,
+        players: list[ComputerPlayer],
+        play: str,
+    ) -> None:
 
-    if game.table_cards_set is False:
-        game.set_table_cards(start_player_number=player_number)
-    game.run()
-    connection_game.send("Exiting")
+        # there is no connection to set up, so only the update queues are taken from Messaging
+        self.init_update_queues(number_of_players=number_of_players)
+        self.players = players
+        self.play: Optional[str] = play
+        return
 
+    def request(self, player_number: int, request_type: RequestType) -> Response:
+
+        if self.play is None:
+            return super().request(player_number=player_number, request_type=request_type)
+
+        updates_message = self.take_player_updates(player_number=player_number)
+        if updates_message is not None:
+            self.notify(messages=[updates_message])
+
+        play = self.play
+        self.play = None
+
+        if request_type == RequestType.SET_TABLE_CARDS:
+            return Response(action=Action.SET_TABLE_CARDS, cards=play)
+        elif play == "1":
+            return Response(action=Action.PICK_UP_DISCARD_PILE)
+        else:
+            return Response(action=Action.PLAY_KNOWN_CARDS, cards=play)
 
-def route_communication(connection: Connection, players: list[ComputerPlayer], play: str) -> bool:
+    def notify(self, messages: list[RoutedMessage]) -> None:
 
-    message = connection.recv()
-    logging.debug(f"Message from game: {message}")
+        for player_number, (kind, payload) in messages:
+            self.players[player_number].handle_communication(kind=kind, payload=payload)
+        return
 
-    if message == "Exiting":
-        return False
-    else:
-        message_dict = json.loads(message)
-        player_number = message_dict["recipient"]
-        response = players[player_number].handle_communication(message=message)
-        logging.debug(f"Response: {response}")
-        connection.send(response)
+    def update(self, messages: list[RoutedMessage]) -> bytes:
 
-    return True
+        for player_number, (kind, payload) in messages:
+            response = self.players[player_number].handle_communication(kind=kind, payload=payload)
+        # the request is always last; its response is a view into the player's send buffer
+        return bytes(response)
@@ -1,22 +1,40 @@
-from itertools import combinations
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, Optional
 
 from pydealer import (  # type: ignore
     Card,
     Stack,
-    VALUES,
 )
 
-from src.constants import (
-    DECODE_SUIT,
-    DECODE_VALUE,
-    ENCODE_SUIT,
-    ENCODE_VALUE,
+from src.card_bits import (
+    card_code,
+    CARD_CODE_BY_NAME,
+    CARD_CODES,
+    card_id,
+    codes_from_mask,
+    mask_from_stack,
+    remove_cards_mask_from_stack,
+    VALUE_INDEX,
+    VALUE_PLAYS,
 )
+from src.constants import DECODE_SUIT, DECODE_VALUE
 from src.exceptions import CardEncodeDecodeException
 from src.game_types import Action, Hand, Play, Response, TableStack
 
 
+# pydealer cards are never mutated, so every decoded card can share one of 52 instances
+CARD_BY_CODE = {
+    code: Card(value=DECODE_VALUE[code[1]], suit=DECODE_SUIT[code[0]]) for code in CARD_CODES
+}
+
+
+def copy_stack(stack: Stack) -> Stack:
+    # cards are never mutated and every Stack copies the cards it is given into its own
+    # deque, so a new Stack over the same cards is as good as a deepcopy, and stacks can be
+    # extended and cleared in place without touching one another
+    return Stack(cards=stack.cards)
+
+
 def are_all_cards_same_value(stack: Stack) -> bool:
 
     if len(stack) == 0:
@@ -33,12 +51,8 @@ def does_play_trump_last_play(cards_played: Stack, last_play: Optional[Stack]) -
     if len(cards_played) < len(last_play):
         return False
 
-    return cards_played[0] >= last_play[0]
-
-
-def card_set_from_stack(stack: Stack) -> set[tuple[str, str]]:
-
-    return set((card.value, card.suit) for card in stack)
+    # card ids order by value then suit, the same ordering as pydealer's Card >=
+    return card_id(cards_played[0]) >= card_id(last_play[0])
 
 
 def convert_response_to_play(response: Response) -> Play:
@@ -56,59 +70,40 @@ def convert_response_to_play(response: Response) -> Play:
 
 def deserialize_cards(encoded_cards: str) -> Stack:
 
-    if len(encoded_cards) == 0:
-        return Stack()
+    # callers mutate the stacks they get back, so each call gets a fresh Stack
+    return Stack(cards=parse_cards(encoded_cards=encoded_cards))
 
-    card_codes = encoded_cards.split(",")
 
-    decoded_cards = []
+@lru_cache(maxsize=1 << 12)
+def parse_cards(encoded_cards: str) -> tuple[Card, ...]:
+    # the same few card strings come by over and over, so each is split and looked up once
 
-    for card_code in card_codes:
-        decoded_cards.append(deserialize_card(card_code))
+    if len(encoded_cards) == 0:
+        return ()
 
-    return Stack(cards=decoded_cards)
+    return tuple([deserialize_card(card_code) for card_code in encoded_cards.split(",")])
 
 
 def deserialize_card(card_code: str) -> Card:
 
-    if len(card_code) != 2:
-        raise CardEncodeDecodeException("Card code not valid")
-
-    if card_code[0] not in DECODE_SUIT:
-        raise CardEncodeDecodeException("Card code not valid")
+    card = CARD_BY_CODE.get(card_code)
 
-    if card_code[1] not in DECODE_VALUE:
+    if card is None:
         raise CardEncodeDecodeException("Card code not valid")
 
-    value = DECODE_VALUE[card_code[1]]
-    suit = DECODE_SUIT[card_code[0]]
-
-    return Card(value=value, suit=suit)
+    return card
 
 
 def serialize_cards(cards: Stack) -> str:
+    return serialize_cards_iter(cards=cards.cards)
 
-    serialized_cards = []
 
-    for card in cards.cards:
-        serialized_cards.append(serialize_card(card))
-
-    return ",".join(serialized_cards)
+def serialize_cards_iter(cards: Iterable[Card]) -> str:
+    return ",".join([CARD_CODE_BY_NAME[card.name] for card in cards])
 
 
 def serialize_card(card: Card) -> str:
-    card_name = card.name
-    suit, value = split_card_name(card_name=card_name)
-
-    return ENCODE_SUIT[suit] + ENCODE_VALUE[value]
-
-
-def split_card_name(card_name: str) -> tuple[str, str]:
-
-    value: str
-    value, suit = card_name.split(" of ")
-
-    return suit, value
+    return card_code(card=card)
 
 
 def build_face_up_table_stack(table_stacks: list[TableStack]) -> Stack:
@@ -130,75 +125,86 @@ def is_play_available(
     available_plays = get_available_plays_from_hand(
         hand=hand, last_play=last_play, discard_pile=discard_pile
     )
-    cards_played.sort()
-    return serialize_cards(cards=cards_played) in available_plays
+    # available plays are serialized in card id order, which is the order codes_from_mask
+    # yields, so the played cards need no sort; a repeated card collapses in the mask, so
+    # the count check stops it passing as a smaller play
+    cards_played_mask = mask_from_stack(cards_played)
+    if cards_played_mask.bit_count() != len(cards_played):
+        return False
+    return ",".join(codes_from_mask(cards_played_mask)) in available_plays
 
 
 def get_available_plays_from_hand(
     hand: Hand, last_play: Optional[Stack], discard_pile: Stack
-) -> set[str]:
+) -> frozenset[str]:
 
-    if len(hand.hand_stack):
-        play_from = hand.hand_stack
+    if hand.hand_mask:
+        play_from_mask = hand.hand_mask
     elif len(hand.table_stacks):
-        play_from = build_face_up_table_stack(hand.table_stacks)
+        play_from_mask = mask_from_stack(build_face_up_table_stack(hand.table_stacks))
     else:
-        return set()
+        return frozenset()
 
-    return get_available_plays_from_stack(
-        stack=play_from, last_play=last_play, discard_pile=discard_pile
+    return get_available_plays_from_cards_mask(
+        cards_mask=play_from_mask, last_play=last_play, discard_pile=discard_pile
     )
 
 
-def get_available_plays_from_stack(
-    stack: Stack, last_play: Optional[Stack], discard_pile: Stack
-) -> set[str]:
+def get_available_plays_from_cards_mask(
+    cards_mask: int, last_play: Optional[Stack], discard_pile: Stack
+) -> frozenset[str]:
 
-    stack.sort()
+    if last_play is None:
+        last_play_value = VALUE_INDEX["2"]
+        last_play_count = 1
+    else:
+        last_play_value = VALUE_INDEX[last_play[0].value]
+        last_play_count = len(last_play)
 
-    cards_by_value: dict[str, list[Card]] = {}
+    # at most the top three discarded cards can combine with a play to make four of a kind
+    discard_tail = tuple(VALUE_INDEX[card.value] for card in discard_pile[-3:])
 
-    for card in stack:
-        if card.value in cards_by_value:
-            cards_by_value[card.value].append(card)
-        else:
-            cards_by_value[card.value] = [card]
+    return get_available_plays_from_mask(
+        hand_mask=cards_mask,
+        last_play_value=last_play_value,
+        last_play_count=last_play_count,
+        discard_tail=discard_tail,
+    )
+
+
+@lru_cache(maxsize=1 << 16)
+def get_available_plays_from_mask(
+    hand_mask: int, last_play_value: int, last_play_count: int, discard_tail: tuple[int, ...]
+) -> frozenset[str]:
+    """
+    Plays are serialized in card id order, which matches the order of a sorted Stack
+    """
 
     available_plays: set[str] = set()
 
-    value_order = {VALUES[i]: i for i in range(len(VALUES))}
+    for value, plays_by_suit_bits in enumerate(VALUE_PLAYS):
 
-    if last_play is None:
-        last_play_order = value_order["2"]
-        last_play_count = 1
-    else:
-        last_play_order = value_order[last_play[0].value]
-        last_play_count = len(last_play)
+        suit_bits = (hand_mask >> (4 * value)) & 0b1111
+
+        if not suit_bits:
+            continue
 
-    for value, cards in cards_by_value.items():
-        if value in ["2", "10"]:
-            for card in cards:
-                available_plays.add(serialize_card(card=card))
+        plays_by_length = plays_by_suit_bits[suit_bits]
+        count = len(plays_by_length) - 1
+
+        if value in (VALUE_INDEX["2"], VALUE_INDEX["10"]):
+            available_plays.update(plays_by_length[1])
         elif (
-            len(cards) < 4
-            and len(discard_pile) >= (4 - len(cards))
-            and are_all_cards_same_value(
-                stack=Stack(cards=cards) + discard_pile[(-4 + len(cards)) :]  # noqa: E203
-            )
+            count < 4
+            and len(discard_tail) >= 4 - count
+            and all(discard_tail[-i] == value for i in range(1, 5 - count))
         ):
-            card_stack = Stack(cards=cards)
-            card_stack.sort()
-            serialized_cards = serialize_cards(cards=card_stack)
-            available_plays.add(serialized_cards)
-        elif value_order[value] >= last_play_order and len(cards) >= last_play_count:
-            for length in range(last_play_count, len(cards) + 1):
-                for card_combination in combinations(cards, length):
-                    card_combination_stack = Stack(cards=card_combination)
-                    card_combination_stack.sort()
-                    serialized_cards = serialize_cards(cards=card_combination_stack)
-                    available_plays.add(serialized_cards)
+            available_plays.update(plays_by_length[count])
+        elif value >= last_play_value and count >= last_play_count:
+            for length in range(last_play_count, count + 1):
+                available_plays.update(plays_by_length[length])
 
-    return available_plays
+    return frozenset(available_plays)
 
 
 def count_player_cards(hand: Hand) -> int:
@@ -212,19 +218,11 @@ def count_player_cards(hand: Hand) -> int:
 
 
 def does_hand_have_known_cards(hand: Hand) -> bool:
-    hand_cards_exist = len(hand.hand_stack) > 0
-    face_up_cards_exist = len(build_face_up_table_stack(table_stacks=hand.table_stacks)) > 0
-    known_cards_exist = hand_cards_exist or face_up_cards_exist
-    return known_cards_exist
-
+    if hand.hand_mask:
+        return True
+    return any(table_stack.top_card is not None for table_stack in hand.table_stacks)
 
-def is_card_in_stack(card: Card, stack: Stack) -> bool:
-    """
-    The pydealer library suggests you should be able to do
-    card in stack... but this is not reliable
-    """
 
-    serialized_card = serialize_card(card=card)
-    serialized_cards = serialize_cards(cards=stack)
-    serialized_cards_list = serialized_cards.split(",")
-    return serialized_card in serialized_cards_list
+def remove_cards_from_stack(stack: Stack, cards: Iterable[Card]) -> None:
+    # a single pass over the stack rather than a Stack.get name search for each card
+    remove_cards_mask_from_stack(stack=stack, cards_mask=mask_from_stack(cards))
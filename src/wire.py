@@ -0,0 +1,132 @@
+import struct
+from typing import Any, Union
+
+import orjson
+
+from src.game_types import Action, RequestType, Response, Update, UpdateType
+
+# Updates travel as positional arrays with a fixed field order, so the
+# wire format carries no field names and decoding is a straight unpack.
+EncodedUpdate = list[Any]
+
+# Messages to players are multipart: a one byte kind frame followed by the payload. Requests
+# carry the RequestType value as a single byte, updates a JSON array of encoded updates.
+UPDATE_MESSAGE = b"\x01"
+REQUEST_MESSAGE = b"\x02"
+
+# The game hands the router a list of (player number, frames) messages per send, so a request
+# and the updates queued ahead of it cross the pipe together. A request is always last.
+# Frames are (kind, payload) pairs; a player handles every pair of a multipart message in
+# order and replies with the response to the last one.
+RoutedMessage = tuple[int, list[bytes]]
+
+# On the pipe each message is a header (player number, kind, payload length) followed by the
+# payload, so the router gets raw bytes instead of a pickle. An empty send ends the game.
+ROUTED_MESSAGE_HEADER = struct.Struct("<BcI")
+EXIT_MESSAGE = b""
+
+# Responses are a fixed header (action value, length of the cards string) followed by the
+# ASCII cards string, packed into a buffer each player allocates once.
+RESPONSE_HEADER = struct.Struct("<BH")
+RESPONSE_BUFFER_SIZE = 256
+
+EncodedResponse = Union[bytes, memoryview]
+
+# Enum calls and .value go through EnumMeta and a descriptor on every use, so the codec maps
+# between members and their wire values with plain dicts built once.
+UPDATE_TYPE_VALUES = {update_type: update_type.value for update_type in UpdateType}
+UPDATE_TYPES = {update_type.value: update_type for update_type in UpdateType}
+ACTION_VALUES = {action: action.value for action in Action}
+ACTIONS = {action.value: action for action in Action}
+ENCODED_REQUESTS = {request_type: bytes((request_type.value,)) for request_type in RequestType}
+REQUEST_TYPES = {request_type.value: request_type for request_type in RequestType}
+
+
+def encode_update(update: Update) -> EncodedUpdate:
+    return [
+        UPDATE_TYPE_VALUES[update.update_type],
+        update.player_number,
+        update.cards,
+        update.number_of_players,
+        update.message,
+    ]
+
+
+def serialize_update(update: Update) -> bytes:
+    return orjson.dumps(encode_update(update))
+
+
+def serialize_update_batch(serialized_updates: list[bytes]) -> bytes:
+    # joining already serialized updates yields the same JSON array as dumping them together
+    return b"[" + b",".join(serialized_updates) + b"]"
+
+
+def decode_update(encoded_update: EncodedUpdate) -> Update:
+    # updates come from our own game server, so skip pydantic validation
+    update_type, player_number, cards, number_of_players, message = encoded_update
+    return Update.construct(
+        update_type=UPDATE_TYPES[update_type],
+        player_number=player_number,
+        cards=cards,
+        number_of_players=number_of_players,
+        message=message,
+    )
+
+
+def encode_response(response: Response, buffer: bytearray) -> memoryview:
+    # packs into the caller's reusable buffer; only an oversized response gets a fresh one
+    cards = response.cards.encode() if response.cards else b""
+    end = RESPONSE_HEADER.size + len(cards)
+    if end > len(buffer):
+        buffer = bytearray(end)
+    RESPONSE_HEADER.pack_into(buffer, 0, ACTION_VALUES[response.action], len(cards))
+    buffer[RESPONSE_HEADER.size : end] = cards  # noqa: E203
+    return memoryview(buffer)[:end]
+
+
+def decode_response(serialized_response: bytes) -> Response:
+    action, cards_length = RESPONSE_HEADER.unpack_from(serialized_response)
+    start = RESPONSE_HEADER.size
+    cards = serialized_response[start : start + cards_length]  # noqa: E203
+    # the header already pins down both fields' types, so there is nothing left to validate
+    return Response.construct(action=ACTIONS[action], cards=cards.decode() if cards else None)
+
+
+def encode_request(request_type: RequestType) -> bytes:
+    return ENCODED_REQUESTS[request_type]
+
+
+def decode_request(encoded_request: bytes) -> RequestType:
+    return REQUEST_TYPES[encoded_request[0]]
+
+
+def encode_routed_messages(messages: list[RoutedMessage]) -> bytes:
+    parts = []
+    for player_number, (kind, payload) in messages:
+        parts.append(ROUTED_MESSAGE_HEADER.pack(player_number, kind, len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def decode_routed_messages(encoded_messages: bytes) -> list[RoutedMessage]:
+    messages = []
+    offset = 0
+    while offset < len(encoded_messages):
+        player_number, kind, length = ROUTED_MESSAGE_HEADER.unpack_from(encoded_messages, offset)
+        offset += ROUTED_MESSAGE_HEADER.size
+        payload = encoded_messages[offset : offset + length]  # noqa: E203
+        messages.append((player_number, [kind, payload]))
+        offset += length
+    return messages
+
+
+def group_routed_messages(messages: list[RoutedMessage]) -> list[RoutedMessage]:
+    # consecutive messages for one player go out as a single multipart message, so updates
+    # ride along with the request that follows them instead of taking their own round trip
+    grouped_messages: list[RoutedMessage] = []
+    for player_number, frames in messages:
+        if grouped_messages and grouped_messages[-1][0] == player_number:
+            grouped_messages[-1][1].extend(frames)
+        else:
+            grouped_messages.append((player_number, list(frames)))
+    return grouped_messages
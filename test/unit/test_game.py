@@ -5,6 +5,7 @@ from multiprocessing import Pipe
 from random import randint
 from typing import Optional
 
+import orjson
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
 from pydealer import (  # type: ignore
@@ -12,6 +13,7 @@ from pydealer import (  # type: ignore
     Stack,
 )
 
+from src.card_bits import mask_from_stack
 from src.constants import DECK_LEN
 from src.exceptions import CardEncodeDecodeException, CardsNotAvailableException
 from src.game import (
@@ -24,7 +26,7 @@ from src.game import (
     TABLE_STACKS,
     TableStack,
 )
-from src.game_types import RequestType, Response
+from src.game_types import RequestType, Response, UpdateType
 from src.messaging import Messaging
 from src.utilities import (
     build_face_up_table_stack,
@@ -32,14 +34,17 @@ from src.utilities import (
     deserialize_cards,
     serialize_cards,
 )
+from src.wire import decode_update
 
 
 @pytest.fixture
 def mock_messaging(monkeypatch: MonkeyPatch) -> Messaging:
-    number_of_players = MAX_PLAYERS - 1
+    # queues for every player any game under test can have
+    number_of_players = MAX_PLAYERS
     connection, _ = Pipe(duplex=True)
     monkeypatch.setattr(connection, "recv", lambda: {"success": True})
     monkeypatch.setattr(connection, "send", lambda body: None)
+    monkeypatch.setattr(connection, "send_bytes", lambda body: None)
     messaging = Messaging(number_of_players=number_of_players, connection=connection)
     return messaging
 
@@ -182,13 +187,13 @@ class TestGame:
         for player_hand in game.player_hands:
             player_hand.table_stacks.append(TableStack(bottom_card=bottom_card))
 
-        game.player_hands[0].hand_stack += Stack(cards=[card1])
-        game.player_hands[0].hand_stack += Stack(cards=[card2])
-        game.player_hands[0].hand_stack += Stack(cards=[card3])
+        game.player_hands[0].add_cards(cards=Stack(cards=[card1]))
+        game.player_hands[0].add_cards(cards=Stack(cards=[card2]))
+        game.player_hands[0].add_cards(cards=Stack(cards=[card3]))
 
-        game.player_hands[1].hand_stack += Stack(cards=[card4])
-        game.player_hands[1].hand_stack += Stack(cards=[card5])
-        game.player_hands[1].hand_stack += Stack(cards=[card6])
+        game.player_hands[1].add_cards(cards=Stack(cards=[card4]))
+        game.player_hands[1].add_cards(cards=Stack(cards=[card5]))
+        game.player_hands[1].add_cards(cards=Stack(cards=[card6]))
 
         stack1 = Stack(cards=[card1, card2, card3])
         stack2 = Stack(cards=[card4, card5, card6])
@@ -230,9 +235,9 @@ class TestGame:
 
         game.player_hands[player_number].table_stacks.append(TableStack(bottom_card=bottom_card))
 
-        game.player_hands[player_number].hand_stack += Stack(cards=[card1])
-        game.player_hands[player_number].hand_stack += Stack(cards=[card2])
-        game.player_hands[player_number].hand_stack += Stack(cards=[card3])
+        game.player_hands[player_number].add_cards(cards=Stack(cards=[card1]))
+        game.player_hands[player_number].add_cards(cards=Stack(cards=[card2]))
+        game.player_hands[player_number].add_cards(cards=Stack(cards=[card3]))
 
         stack = Stack(cards=[card1, card2, card3])
 
@@ -288,9 +293,9 @@ class TestGame:
 
         game.player_hands[player_number].table_stacks.append(TableStack(bottom_card=bottom_card))
 
-        game.player_hands[player_number].hand_stack += Stack(cards=[card1])
-        game.player_hands[player_number].hand_stack += Stack(cards=[card2])
-        game.player_hands[player_number].hand_stack += Stack(cards=[card3])
+        game.player_hands[player_number].add_cards(cards=Stack(cards=[card1]))
+        game.player_hands[player_number].add_cards(cards=Stack(cards=[card2]))
+        game.player_hands[player_number].add_cards(cards=Stack(cards=[card3]))
 
         stack = Stack(cards=[card1, card2, card3])
 
@@ -336,7 +341,7 @@ class TestGame:
 
         game.deal_table_cards()
 
-        game.player_hands[0].hand_stack = hand_stack
+        game.player_hands[0].add_cards(cards=hand_stack)
 
         monkeypatch.setattr(
             game.messaging,
@@ -410,6 +415,20 @@ class TestGame:
         for player_hand in game.player_hands:
             assert len(player_hand.hand_stack) == HAND_CARDS + TABLE_STACKS
 
+    def test_deal_hand_cards_updates(self, game: Game, mock_messaging: Messaging) -> None:
+
+        mock_messaging.discard_updates()
+        game.deal_hand_cards()
+
+        # each player is sent its whole hand in a single update
+        for player_number, player_hand in enumerate(game.player_hands):
+            update_queue = mock_messaging.update_queues[player_number]
+            assert len(update_queue) == 1
+            update = decode_update(orjson.loads(update_queue[0]))
+            assert update.update_type == UpdateType.INITIAL_DEAL
+            assert update.player_number is None
+            assert update.cards == serialize_cards(player_hand.hand_stack)
+
     def test_deal_card(self, game: Game) -> None:
 
         player_number = randint(0, game.number_of_players - 1)
@@ -472,7 +491,7 @@ class TestGame:
         card1 = Card(suit="Spades", value="3")
         card2 = Card(suit="Hearts", value="3")
 
-        game.player_hands[player_number].hand_stack = Stack(cards=[card1, card2])
+        game.player_hands[player_number].add_cards(cards=Stack(cards=[card1, card2]))
 
         game.loop_until_valid_play(player_number=player_number)
 
@@ -481,6 +500,7 @@ class TestGame:
         [
             (False, Exception, nullcontext()),
             (True, CardsNotAvailableException, pytest.raises(CardsNotAvailableException)),
+            (True, AssertionError, pytest.raises(AssertionError)),
             (True, Exception, pytest.raises(Exception)),
         ],
     )
@@ -527,7 +547,7 @@ class TestGame:
         player_number = 0
         game.deal_table_cards()
         game.discard_pile = Stack(cards=[Card(value="2", suit="Spades")])
-        game.player_hands[player_number].hand_stack = hand_cards
+        game.player_hands[player_number].add_cards(cards=hand_cards)
         play = game.receive_and_validate_play(player_number=player_number)
         assert play.action == expected_action
 
@@ -614,7 +634,7 @@ class TestGame:
 
         game.discard_pile = deserialize_cards(discard_pile)
         game.last_play = deserialize_cards(last_play)
-        game.player_hands[0].hand_stack = deserialize_cards(hand_stack)
+        game.player_hands[0].add_cards(cards=deserialize_cards(hand_stack))
 
         with expected:
             game.validate_play(play=play, player_number=0)
@@ -728,8 +748,8 @@ class TestGame:
             cards=[Card(suit="Diamonds", value="7"), Card(suit="Diamonds", value="8")]
         )
         game.discard_pile = copy.deepcopy(discard_pile)
-        game.player_hands[player_number].hand_stack = deserialize_cards(
-            encoded_cards=encoded_hand_cards
+        game.player_hands[player_number].add_cards(
+            cards=deserialize_cards(encoded_cards=encoded_hand_cards)
         )
         game.last_play = deserialize_cards(encoded_cards="H5")
 
@@ -764,8 +784,8 @@ class TestGame:
         player_number = 0
         game.last_play = deserialize_cards(encoded_cards="S7")
 
-        game.player_hands[player_number].hand_stack = deserialize_cards(
-            encoded_cards=encoded_hand_cards
+        game.player_hands[player_number].add_cards(
+            cards=deserialize_cards(encoded_cards=encoded_hand_cards)
         )
         game.play_cards(
             player_number=player_number, cards=deserialize_cards(encoded_cards=played_cards)
@@ -825,13 +845,16 @@ class TestGame:
     ) -> None:
 
         player_number = 0
-        game.player_hands[player_number].hand_stack = copy.deepcopy(hand_stack)
+        game.player_hands[player_number].add_cards(cards=hand_stack)
 
         with raises:
             game.remove_cards_from_hand_stack(player_number=player_number, cards=cards)
 
             assert len(game.player_hands[player_number].hand_stack) == 1
 
+        hand = game.player_hands[player_number]
+        assert hand.hand_mask == mask_from_stack(hand.hand_stack)
+
     @pytest.mark.parametrize(
         "table_stacks,cards,raises",
         [
@@ -854,6 +877,16 @@ class TestGame:
                 Stack(cards=[Card(value="9", suit="Hearts")]),
                 pytest.raises(CardsNotAvailableException),
             ),
+            (
+                [
+                    TableStack(
+                        bottom_card=Card(value="8", suit="Hearts"),
+                        top_card=Card(value="9", suit="Hearts"),
+                    ),
+                ],
+                Stack(cards=[Card(value="9", suit="Hearts"), Card(value="9", suit="Hearts")]),
+                pytest.raises(CardsNotAvailableException),
+            ),
         ],
     )
     def test_remove_cards_from_face_up(
@@ -894,7 +927,7 @@ class TestGame:
     ) -> None:
 
         player_number = 0
-        game.player_hands[player_number].hand_stack = copy.deepcopy(hand_stack)
+        game.player_hands[player_number].add_cards(cards=hand_stack)
 
         game.player_hands[player_number].table_stacks = copy.deepcopy(table_stacks)
 
@@ -915,6 +948,6 @@ class TestGame:
 
         with raises:
             if card is not None:
-                game.player_hands[0].hand_stack += Stack(cards=[card])
+                game.player_hands[0].add_cards(cards=Stack(cards=[card]))
             game.deal_card(player_number=0)
             game.assert_conservation_of_cards()
@@ -0,0 +1,289 @@
+from typing import Any
+
+import pytest
+
+from src.card_bits import mask_from_stack
+from src.constants import DECK_LEN, HAND_CARDS, TABLE_STACKS
+from src.game_types import Update, UpdateType
+from src.player_state import PlayerState
+from src.utilities import deserialize_cards
+
+NUMBER_OF_PLAYERS = 3
+PLAYER_NUMBER = 0
+OPPONENT_NUMBER = 1
+HAND = "H2,C3,D4,S5,H6,C7"
+TABLE_CARDS = "H2,C3,D4"
+OPPONENT_TABLE_CARDS = "S2,S3,S4"
+
+
+@pytest.fixture
+def player_state() -> PlayerState:
+    player_state = PlayerState(player_number=PLAYER_NUMBER)
+    player_state.update_state(
+        update=Update(update_type=UpdateType.GAME_INITIATED, number_of_players=NUMBER_OF_PLAYERS)
+    )
+    return player_state
+
+
+@pytest.fixture
+def dealt_player_state(player_state: PlayerState) -> PlayerState:
+    # our table cards are set, as are those of one opponent; the other has only been dealt
+    update(player_state, update_type=UpdateType.INITIAL_DEAL, cards=HAND)
+    update(
+        player_state,
+        update_type=UpdateType.SET_TABLE_CARDS,
+        player_number=PLAYER_NUMBER,
+        cards=TABLE_CARDS,
+    )
+    update(
+        player_state,
+        update_type=UpdateType.SET_TABLE_CARDS,
+        player_number=OPPONENT_NUMBER,
+        cards=OPPONENT_TABLE_CARDS,
+    )
+    return player_state
+
+
+def update(player_state: PlayerState, **fields: Any) -> None:
+    player_state.update_state(update=Update(**fields))
+
+
+def mask_of(encoded_cards: str) -> int:
+    return mask_from_stack(deserialize_cards(encoded_cards=encoded_cards))
+
+
+class TestPlayerState:
+    def test_initial_deal(self, player_state: PlayerState) -> None:
+
+        player_state.update_state(update=Update(update_type=UpdateType.INITIAL_DEAL, cards=HAND))
+
+        dealt_cards = HAND_CARDS + TABLE_STACKS
+        assert player_state.hand.hand_stack == deserialize_cards(encoded_cards=HAND)
+        assert player_state.hand.hand_mask == mask_from_stack(
+            deserialize_cards(encoded_cards=HAND)
+        )
+        assert player_state.deck_length == (
+            DECK_LEN - (TABLE_STACKS + dealt_cards) * NUMBER_OF_PLAYERS
+        )
+        for opponent in player_state.opponents.values():
+            assert opponent.hand_count_unknown == dealt_cards
+            assert len(opponent.hand_stack) == 0
+
+    def test_set_table_cards(self, dealt_player_state: PlayerState) -> None:
+
+        hand = dealt_player_state.hand
+        assert mask_from_stack(hand.table_stack) == hand.table_mask == mask_of(TABLE_CARDS)
+        assert mask_from_stack(hand.hand_stack) == hand.hand_mask == mask_of("S5,H6,C7")
+        assert dealt_player_state.table_cards_set is True
+
+        opponent = dealt_player_state.opponents[OPPONENT_NUMBER]
+        assert mask_from_stack(opponent.table_stack) == mask_of(OPPONENT_TABLE_CARDS)
+        assert opponent.hand_count_unknown == HAND_CARDS
+        assert opponent.hand_mask == 0
+
+    def test_draw(self, dealt_player_state: PlayerState) -> None:
+
+        deck_length = dealt_player_state.deck_length
+
+        update(dealt_player_state, update_type=UpdateType.YOU_DREW_CARD, cards="D9")
+
+        hand = dealt_player_state.hand
+        assert mask_from_stack(hand.hand_stack) == hand.hand_mask == mask_of("S5,H6,C7,D9")
+        assert dealt_player_state.deck_length == deck_length - 1
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAYER_DREW_CARD,
+            player_number=OPPONENT_NUMBER,
+        )
+
+        opponent = dealt_player_state.opponents[OPPONENT_NUMBER]
+        assert opponent.hand_count_unknown == HAND_CARDS + 1
+        assert opponent.hand_mask == 0
+        assert dealt_player_state.deck_length == deck_length - 2
+
+    def test_play_from_hand(self, dealt_player_state: PlayerState) -> None:
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_HAND,
+            player_number=PLAYER_NUMBER,
+            cards="S5",
+        )
+
+        hand = dealt_player_state.hand
+        assert mask_from_stack(hand.hand_stack) == hand.hand_mask == mask_of("H6,C7")
+        assert mask_from_stack(dealt_player_state.discard_pile) == mask_of("S5")
+        assert dealt_player_state.last_play == deserialize_cards(encoded_cards="S5")
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_HAND,
+            player_number=OPPONENT_NUMBER,
+            cards="D9",
+        )
+
+        opponent = dealt_player_state.opponents[OPPONENT_NUMBER]
+        assert opponent.hand_count_unknown == HAND_CARDS - 1
+        assert mask_from_stack(dealt_player_state.discard_pile) == mask_of("S5,D9")
+        assert dealt_player_state.last_play == deserialize_cards(encoded_cards="D9")
+
+    def test_pickup_discard_pile(self, dealt_player_state: PlayerState) -> None:
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_HAND,
+            player_number=PLAYER_NUMBER,
+            cards="S5",
+        )
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAYER_PICKED_UP_DISCARD_PILE,
+            player_number=OPPONENT_NUMBER,
+        )
+
+        opponent = dealt_player_state.opponents[OPPONENT_NUMBER]
+        assert mask_from_stack(opponent.hand_stack) == opponent.hand_mask == mask_of("S5")
+        assert opponent.hand_count_unknown == HAND_CARDS
+        assert len(dealt_player_state.discard_pile) == 0
+        assert dealt_player_state.last_play is None
+
+        # a known card played back comes out of the opponent's known hand, not the unknown count
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_HAND,
+            player_number=OPPONENT_NUMBER,
+            cards="S5,D5",
+        )
+
+        assert len(opponent.hand_stack) == 0
+        assert opponent.hand_mask == 0
+        assert opponent.hand_count_unknown == HAND_CARDS - 1
+
+        update(
+            dealt_player_state, update_type=UpdateType.YOU_PICKED_UP_DISCARD_PILE, cards="S5,D5"
+        )
+
+        hand = dealt_player_state.hand
+        assert mask_from_stack(hand.hand_stack) == hand.hand_mask == mask_of("S5,H6,C7,D5")
+        assert len(dealt_player_state.discard_pile) == 0
+        assert dealt_player_state.last_play is None
+
+    def test_play_from_table(self, dealt_player_state: PlayerState) -> None:
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_TABLE,
+            player_number=PLAYER_NUMBER,
+            cards="H2",
+        )
+
+        hand = dealt_player_state.hand
+        assert mask_from_stack(hand.table_stack) == hand.table_mask == mask_of("C3,D4")
+        assert mask_from_stack(dealt_player_state.discard_pile) == mask_of("H2")
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_TABLE,
+            player_number=OPPONENT_NUMBER,
+            cards="S2",
+        )
+
+        opponent = dealt_player_state.opponents[OPPONENT_NUMBER]
+        assert mask_from_stack(opponent.table_stack) == mask_of("S3,S4")
+        assert mask_from_stack(dealt_player_state.discard_pile) == mask_of("H2,S2")
+        assert dealt_player_state.last_play == deserialize_cards(encoded_cards="S2")
+
+    def test_play_from_faceup_failure(self, dealt_player_state: PlayerState) -> None:
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_FACEUP_FAILURE,
+            player_number=PLAYER_NUMBER,
+            cards="C3",
+        )
+
+        hand = dealt_player_state.hand
+        assert mask_from_stack(hand.table_stack) == hand.table_mask == mask_of("H2,D4")
+        assert mask_from_stack(hand.hand_stack) == hand.hand_mask == mask_of("S5,H6,C7,C3")
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_FACEUP_FAILURE,
+            player_number=OPPONENT_NUMBER,
+            cards="S3",
+        )
+
+        opponent = dealt_player_state.opponents[OPPONENT_NUMBER]
+        assert mask_from_stack(opponent.table_stack) == mask_of("S2,S4")
+        assert mask_from_stack(opponent.hand_stack) == opponent.hand_mask == mask_of("S3")
+        assert opponent.hand_count_unknown == HAND_CARDS
+
+    def test_play_from_facedown(self, dealt_player_state: PlayerState) -> None:
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_FACEDOWN_SUCCESS,
+            player_number=PLAYER_NUMBER,
+            cards="DK",
+        )
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_FACEDOWN_FAILURE,
+            player_number=PLAYER_NUMBER,
+            cards="D3",
+        )
+
+        hand = dealt_player_state.hand
+        assert hand.table_stacks == TABLE_STACKS - 2
+        assert mask_from_stack(hand.hand_stack) == hand.hand_mask == mask_of("S5,H6,C7,D3")
+        assert mask_from_stack(dealt_player_state.discard_pile) == mask_of("DK")
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_FACEDOWN_SUCCESS,
+            player_number=OPPONENT_NUMBER,
+            cards="CK",
+        )
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_FACEDOWN_FAILURE,
+            player_number=OPPONENT_NUMBER,
+            cards="C4",
+        )
+
+        opponent = dealt_player_state.opponents[OPPONENT_NUMBER]
+        assert opponent.table_stacks == TABLE_STACKS - 2
+        assert mask_from_stack(opponent.hand_stack) == opponent.hand_mask == mask_of("C4")
+        assert mask_from_stack(dealt_player_state.discard_pile) == mask_of("DK,CK")
+
+    def test_burn_discard_pile(self, dealt_player_state: PlayerState) -> None:
+
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_HAND,
+            player_number=PLAYER_NUMBER,
+            cards="S5",
+        )
+        update(
+            dealt_player_state,
+            update_type=UpdateType.PLAY_FROM_HAND,
+            player_number=OPPONENT_NUMBER,
+            cards="DT",
+        )
+        update(dealt_player_state, update_type=UpdateType.BURN_DISCARD_PILE)
+
+        assert mask_from_stack(dealt_player_state.eliminated_cards) == mask_of("S5,DT")
+        assert len(dealt_player_state.discard_pile) == 0
+        assert dealt_player_state.last_play is None
+
+    @pytest.mark.parametrize(
+        "player_number,expected_win", [(PLAYER_NUMBER, 1), (OPPONENT_NUMBER, 0)]
+    )
+    def test_player_wins(
+        self, dealt_player_state: PlayerState, player_number: int, expected_win: int
+    ) -> None:
+
+        update(dealt_player_state, update_type=UpdateType.PLAYER_WINS, player_number=player_number)
+
+        assert dealt_player_state.win == expected_win
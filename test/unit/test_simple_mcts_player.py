@@ -0,0 +1,54 @@
+import pytest
+
+from src.game_types import Action, RequestType, Response, Update, UpdateType
+from src.player_state import PlayerState
+from src.players.greedy_player import GreedyPlayer
+from src.players.simple_mcts_player import simulate, SimulatedMessaging
+
+NUMBER_OF_PLAYERS = 2
+PLAYER_NUMBER = 0
+HAND = "H2,C3,D4,S5,H6,C7"
+
+
+@pytest.fixture
+def player_state() -> PlayerState:
+    player_state = PlayerState(player_number=PLAYER_NUMBER)
+    player_state.update_state(
+        update=Update(update_type=UpdateType.GAME_INITIATED, number_of_players=NUMBER_OF_PLAYERS)
+    )
+    player_state.update_state(update=Update(update_type=UpdateType.INITIAL_DEAL, cards=HAND))
+    return player_state
+
+
+@pytest.fixture
+def players() -> list[GreedyPlayer]:
+    return [GreedyPlayer(player_number=i, suppress_logs=True) for i in range(NUMBER_OF_PLAYERS)]
+
+
+@pytest.mark.parametrize(
+    "request_type,play,expected",
+    [
+        (
+            RequestType.SET_TABLE_CARDS,
+            "H2,C3,D4",
+            Response(action=Action.SET_TABLE_CARDS, cards="H2,C3,D4"),
+        ),
+        (RequestType.PLAY, "1", Response(action=Action.PICK_UP_DISCARD_PILE)),
+        (RequestType.PLAY, "S5", Response(action=Action.PLAY_KNOWN_CARDS, cards="S5")),
+    ],
+)
+def test_simulated_messaging_first_request(
+    players: list[GreedyPlayer], request_type: RequestType, play: str, expected: Response
+) -> None:
+
+    messaging = SimulatedMessaging(number_of_players=NUMBER_OF_PLAYERS, players=players, play=play)
+
+    assert messaging.request(player_number=PLAYER_NUMBER, request_type=request_type) == expected
+    assert messaging.play is None
+
+
+def test_simulate(player_state: PlayerState) -> None:
+
+    # the table cards are not set yet, so the tested play is the table card selection
+    for i in range(5):
+        assert isinstance(simulate(player_state=player_state, play="H2,C3,D4"), bool)
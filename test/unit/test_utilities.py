@@ -1,9 +1,19 @@
 import pytest
 
+from src.card_bits import codes_from_mask, mask_from_stack
+from src.game_types import Hand
 from src.utilities import (
     are_all_cards_same_value,
+    copy_stack,
     deserialize_cards,
     does_play_trump_last_play,
+    get_available_plays_from_cards_mask,
+    is_play_available,
+    remove_cards_from_stack,
+    remove_cards_mask_from_stack,
+    serialize_card,
+    serialize_cards,
+    serialize_cards_iter,
 )
 
 
@@ -42,3 +52,134 @@ def test_does_play_trump_last_play(
         last_play = None
 
     assert does_play_trump_last_play(cards_played=cards_played, last_play=last_play) == expected
+
+
+@pytest.mark.parametrize(
+    "encoded_cards",
+    [
+        "",
+        "H4",
+        "D2,CA,ST,HK",
+    ],
+)
+def test_card_mask_round_trip(encoded_cards: str) -> None:
+
+    stack = deserialize_cards(encoded_cards=encoded_cards)
+    mask = mask_from_stack(stack=stack)
+
+    assert mask.bit_count() == len(stack)
+    assert (
+        mask_from_stack(deserialize_cards(encoded_cards=",".join(codes_from_mask(mask)))) == mask
+    )
+    assert sorted(codes_from_mask(mask=mask)) == sorted(filter(None, encoded_cards.split(",")))
+
+
+@pytest.mark.parametrize(
+    "encoded_hand,encoded_last_play,encoded_discard_pile,expected",
+    [
+        ("H4,S4,D9", "C3", "C3", {"H4", "S4", "H4,S4", "D9"}),
+        ("H4,S4,D9", "C5,D5", "C5,D5", set()),
+        ("H4,S4,D2,DT", "C9", "C9", {"D2", "DT"}),
+        ("H4,S9", "CQ", "D4,C4,CQ", set()),
+        ("H4,S3", "CK", "D4,CK,C4", set()),
+        ("H4,S3", "CK", "D4,C4,S4", {"H4"}),
+    ],
+)
+def test_get_available_plays_from_cards_mask(
+    encoded_hand: str, encoded_last_play: str, encoded_discard_pile: str, expected: set[str]
+) -> None:
+
+    available_plays = get_available_plays_from_cards_mask(
+        cards_mask=mask_from_stack(deserialize_cards(encoded_cards=encoded_hand)),
+        last_play=deserialize_cards(encoded_cards=encoded_last_play),
+        discard_pile=deserialize_cards(encoded_cards=encoded_discard_pile),
+    )
+
+    assert available_plays == expected
+
+
+def test_deserialize_cards_returns_fresh_stacks() -> None:
+
+    first = deserialize_cards(encoded_cards="HQ,ST")
+    first += deserialize_cards(encoded_cards="D2")
+    first.cards.pop()
+
+    assert serialize_cards(cards=deserialize_cards(encoded_cards="HQ,ST")) == "HQ,ST"
+
+
+@pytest.mark.parametrize("encoded_cards", ["", "HQ", "ST,S9,D2"])
+def test_serialize_cards_iter(encoded_cards: str) -> None:
+
+    cards_list = list(deserialize_cards(encoded_cards=encoded_cards).cards)
+
+    assert serialize_cards_iter(cards=cards_list) == encoded_cards
+
+
+def test_serialize_cards_shares_card_codes() -> None:
+
+    first = deserialize_cards(encoded_cards="HQ,ST")
+    second = deserialize_cards(encoded_cards="ST,HQ")
+
+    assert serialize_card(card=first[0]) is serialize_card(card=second[1])
+
+
+@pytest.mark.parametrize(
+    "encoded_cards,encoded_removed,expected",
+    [
+        ("H4,S9,D2,CA", "S9,CA", "H4,D2"),
+        ("H4,S9", "D2", "H4,S9"),
+        ("H4", "H4", ""),
+    ],
+)
+def test_remove_cards_from_stack(encoded_cards: str, encoded_removed: str, expected: str) -> None:
+
+    stack = deserialize_cards(encoded_cards=encoded_cards)
+
+    remove_cards_from_stack(stack=stack, cards=deserialize_cards(encoded_cards=encoded_removed))
+
+    assert serialize_cards(cards=stack) == expected
+
+
+def test_remove_cards_mask_from_stack() -> None:
+
+    stack = deserialize_cards(encoded_cards="H4,S9,D2,CA")
+
+    cards_mask = mask_from_stack(deserialize_cards(encoded_cards="CA,H4,HK"))
+    remove_cards_mask_from_stack(stack=stack, cards_mask=cards_mask)
+
+    assert serialize_cards(cards=stack) == "S9,D2"
+
+
+@pytest.mark.parametrize(
+    "encoded_hand,encoded_cards_played,expected",
+    [
+        ("H4,S4,D9", "S4,H4", True),
+        ("H4,S4,D9", "H4,H4", False),
+        ("H4,S4,D9", "H4,D9", False),
+        ("H4,S4,D9", "C4", False),
+    ],
+)
+def test_is_play_available(encoded_hand: str, encoded_cards_played: str, expected: bool) -> None:
+
+    hand = Hand(hand_stack=deserialize_cards(encoded_cards=encoded_hand))
+
+    assert (
+        is_play_available(
+            hand=hand,
+            last_play=None,
+            cards_played=deserialize_cards(encoded_cards=encoded_cards_played),
+            discard_pile=deserialize_cards(encoded_cards=""),
+        )
+        == expected
+    )
+
+
+def test_copy_stack() -> None:
+
+    stack = deserialize_cards(encoded_cards="H4,S9,D2")
+
+    copied_stack = copy_stack(stack=stack)
+    remove_cards_from_stack(stack=copied_stack, cards=deserialize_cards(encoded_cards="S9"))
+
+    assert serialize_cards(cards=stack) == "H4,S9,D2"
+    assert serialize_cards(cards=copied_stack) == "H4,D2"
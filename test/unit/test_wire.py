@@ -0,0 +1,108 @@
+import orjson
+import pytest
+
+from src.game_types import Action, RequestType, Response, Update, UpdateType
+from src.wire import (
+    decode_request,
+    decode_response,
+    decode_routed_messages,
+    decode_update,
+    encode_request,
+    encode_response,
+    encode_routed_messages,
+    encode_update,
+    group_routed_messages,
+    REQUEST_MESSAGE,
+    RESPONSE_BUFFER_SIZE,
+    RoutedMessage,
+    serialize_update,
+    serialize_update_batch,
+    UPDATE_MESSAGE,
+)
+
+
+@pytest.mark.parametrize(
+    "update",
+    [
+        Update(update_type=UpdateType.GAME_INITIATED, number_of_players=3),
+        Update(update_type=UpdateType.PLAY_FROM_HAND, player_number=1, cards="H4,S4"),
+        Update(update_type=UpdateType.INVALID_ACTION, message="Illegal play, try again"),
+        Update(update_type=UpdateType.BURN_DISCARD_PILE),
+    ],
+)
+def test_update_round_trip(update: Update) -> None:
+
+    # the updates above are validated as they are built, so the unvalidated decode must match
+    assert decode_update(encode_update(update)) == update
+
+
+@pytest.mark.parametrize("count", [0, 1, 3])
+def test_serialize_update_batch(count: int) -> None:
+
+    updates = [
+        Update(update_type=UpdateType.PLAY_FROM_HAND, player_number=i, cards="H4")
+        for i in range(count)
+    ]
+
+    payload = serialize_update_batch([serialize_update(update) for update in updates])
+
+    assert [decode_update(encoded_update) for encoded_update in orjson.loads(payload)] == updates
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        Response(action=Action.PICK_UP_DISCARD_PILE),
+        Response(action=Action.PLAY_KNOWN_CARDS, cards="D9,C9"),
+    ],
+)
+def test_response_round_trip(response: Response) -> None:
+
+    encoded_response = encode_response(response=response, buffer=bytearray(RESPONSE_BUFFER_SIZE))
+
+    assert decode_response(bytes(encoded_response)) == response
+
+
+def test_encode_response_oversized() -> None:
+
+    buffer = bytearray(4)
+    response = Response(action=Action.PLAY_KNOWN_CARDS, cards="D9,C9,H9")
+
+    encoded_response = encode_response(response=response, buffer=buffer)
+
+    assert decode_response(bytes(encoded_response)) == response
+    assert len(buffer) == 4
+
+
+@pytest.mark.parametrize("request_type", list(RequestType))
+def test_request_round_trip(request_type: RequestType) -> None:
+
+    assert decode_request(encode_request(request_type=request_type)) == request_type
+
+
+@pytest.mark.parametrize(
+    "messages",
+    [
+        [(2, [REQUEST_MESSAGE, b"\x01"])],
+        [(0, [UPDATE_MESSAGE, b'[[202,null,"H4",null,null]]']), (0, [REQUEST_MESSAGE, b"\x02"])],
+        [(1, [UPDATE_MESSAGE, b"[]"]), (3, [UPDATE_MESSAGE, b""])],
+    ],
+)
+def test_routed_messages_round_trip(messages: list[RoutedMessage]) -> None:
+
+    assert decode_routed_messages(encode_routed_messages(messages)) == messages
+
+
+def test_group_routed_messages() -> None:
+
+    messages = [
+        (1, [UPDATE_MESSAGE, b"[]"]),
+        (0, [UPDATE_MESSAGE, b"[]"]),
+        (0, [REQUEST_MESSAGE, b"\x02"]),
+    ]
+
+    assert group_routed_messages(messages) == [
+        (1, [UPDATE_MESSAGE, b"[]"]),
+        (0, [UPDATE_MESSAGE, b"[]", REQUEST_MESSAGE, b"\x02"]),
+    ]
+    assert messages[1] == (0, [UPDATE_MESSAGE, b"[]"])